@@ -128,6 +128,12 @@ class si4703Radio():
         self.si4703_rds_ps = [0] * 8
         self.si4703_rds_rt = [0] * 64
 
+        # health counters, read by the metrics endpoint (_rdsmetrics.py)
+        self.i2c_reads = 0
+        self.i2c_writes = 0
+        self.i2c_errors = 0
+        self.tune_stat = {'seek':[0,0.0,0.0], 'tune':[0,0.0,0.0]} # count, total seconds, last seconds
+
         if (self.irqPIN == -1): self.si4703UseIRQ = False
         else:
           self.si4703UseIRQ = True
@@ -169,6 +175,7 @@ class si4703Radio():
         self.si4703Seek(-1,out=out)
 
     def si4703Seek(self,seekDirection,out=True):
+        t0=time.monotonic()
         self.si4703ReadRegisters()
         # Set seek mode wrap bit
         preg=self.si4703_registers[self.SI4703_POWERCFG] # placeholder variable to make it more readable
@@ -197,6 +204,7 @@ class si4703Radio():
             self.si4703ReadRegisters()
             self.si4703_registers[self.SI4703_POWERCFG] &= ~(1<<self.SI4703_SEEK) #Clear the tune after a tune has completed
             self.si4703WriteRegisters()
+        self.tunetime('seek',t0)
 
 
     def si4703SetChannel(self,channel,out=True):
@@ -206,6 +214,7 @@ class si4703Radio():
         newChannel=int(newChannel)
 
         # These steps come from AN230 page 20 rev 0.9
+        t0=time.monotonic()
         self.si4703ReadRegisters()
         self.si4703_registers[self.SI4703_CHANNEL] &= 0xFE00 # Clear out the channel bits
         self.si4703_registers[self.SI4703_CHANNEL] |= newChannel; # Mask in the new channel
@@ -232,6 +241,14 @@ class si4703Radio():
             self.si4703ReadRegisters()
             self.si4703_registers[self.SI4703_CHANNEL] &= ~(1<<self.SI4703_TUNE) #Clear the tune after a tune has completed
             self.si4703WriteRegisters()
+        self.tunetime('tune',t0)
+
+    def tunetime(self,op,t0):
+        dt=time.monotonic()-t0
+        x=self.tune_stat[op]
+        x[0]+=1
+        x[1]+=dt
+        x[2]=dt
 
 
     def si4703SetVolume(self,volume):
@@ -369,7 +386,9 @@ class si4703Radio():
             i2cWriteBytes[i*2], i2cWriteBytes[(i*2)+1] = divmod(self.si4703_registers[i+2], 0x100)
 
         # the "address" of the SMBUS write command is not used on the si4703 - need to use the first byte
-        self.i2c.write_i2c_block_data(self.i2CAddr, i2cWriteBytes[0], i2cWriteBytes[1:11])
+        self.i2c_writes += 1
+        try: self.i2c.write_i2c_block_data(self.i2CAddr, i2cWriteBytes[0], i2cWriteBytes[1:11])
+        except OSError: self.i2c_errors += 1; raise
 
 
     def si4703ReadRegisters(self):
@@ -382,7 +401,9 @@ class si4703Radio():
         # Need to send the current value of the upper byte of register 0x02 as command byte
         cmdByte = self.si4703_registers[0x02] >> 8
 
-        i2cReadBytes = self.i2c.read_i2c_block_data(self.i2CAddr, cmdByte, 32)
+        self.i2c_reads += 1
+        try: i2cReadBytes = self.i2c.read_i2c_block_data(self.i2CAddr, cmdByte, 32)
+        except OSError: self.i2c_errors += 1; raise
         regIndex = 0x0A
 
         #Remember, register 0x0A comes in first so we have to shuffle the array around a bit
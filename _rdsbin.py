@@ -0,0 +1,96 @@
+
+# compact binary capture: 16-byte file header, then fixed 20-byte records, little endian
+#   header: magic 'RDSB', version, record size, start time (unix ns)
+#   record: time since start (ms, 64 bits), blocks A-D, corrections (2 bits per block, A in bits 7-6), RSSI, channel
+# version 1 had a 32-bit time (16-byte records, ended after 49 days), still read
+# fixed records give random access by index; the reader maps the file and unpacks in C, no text parsing
+
+from struct import Struct
+from time import monotonic
+
+RDSB_MAGIC=b'RDSB'
+RDSB_VERSION=2
+RDSB_HDR=Struct('<4sHHq')
+RDSB_REC=Struct('<QHHHHBBH')
+RDSB_RECS={1:Struct('<LHHHHBBH'),2:RDSB_REC} # record layout by version
+
+RDSB_FLUSH_COUNT=256  # records buffered before write
+RDSB_FLUSH_TIME=2.0   # max seconds a record stays buffered
+
+
+def rdsb_packcorr(corr):
+    return (corr[0]<<6)|(corr[1]<<4)|(corr[2]<<2)|corr[3]
+
+def rdsb_unpackcorr(c):
+    return [c>>6,(c>>4)&3,(c>>2)&3,c&3]
+
+
+# writer; out is a binary stream, start the unix time of the capture start
+class rdsb_writer(object):
+    def __init__(self,out,chan=0,start=0.0):
+        self.out=out
+        self.buf=bytearray()
+        self.cnt=0
+        self.tflush=monotonic()
+        self.chan=chan
+        self.startms=int(start*1000)
+        self.out.write(RDSB_HDR.pack(RDSB_MAGIC,RDSB_VERSION,RDSB_REC.size,int(start*1000)*1000000))
+
+    def write(self,rds,t,chan=0,rssi=-1,corr=None):
+        if chan: self.chan=chan
+        self.buf+=RDSB_REC.pack(max(0,int(t*1000)-self.startms),rds[0],rds[1],rds[2],rds[3],
+                                rdsb_packcorr(corr or [0,0,0,0]),max(0,min(rssi,255)),self.chan)
+        self.cnt+=1
+        if self.cnt>=RDSB_FLUSH_COUNT or monotonic()-self.tflush>=RDSB_FLUSH_TIME: self.flush()
+
+    def flush(self):
+        if self.buf:
+          self.out.write(self.buf)
+          self.buf=bytearray()
+        self.out.flush()
+        self.cnt=0
+        self.tflush=monotonic()
+
+
+# capture opened for reading: a mapped file, or bytes for pipes
+class rdsb_reader(object):
+    def __init__(self,f):
+        try:
+          from mmap import mmap, ACCESS_READ
+          self.data=mmap(f.fileno(),0,access=ACCESS_READ)
+        except (OSError,ValueError): # pipe, or empty
+          self.data=f.read()
+        if len(self.data)<RDSB_HDR.size: raise ValueError('not an RDSB capture')
+        magic,ver,recsize,startns=RDSB_HDR.unpack_from(self.data,0)
+        self.rec=RDSB_RECS.get(ver)
+        if magic!=RDSB_MAGIC or self.rec==None or recsize!=self.rec.size: raise ValueError(f'not an RDSB v1/v{RDSB_VERSION} capture')
+        self.start=startns/1e9
+        self.count=(len(self.data)-RDSB_HDR.size)//self.rec.size
+
+    # record i as (time since start in ms, A, B, C, D, packed corrections, RSSI, channel)
+    def record(self,i):
+        return self.rec.unpack_from(self.data,RDSB_HDR.size+i*self.rec.size)
+
+    # all records from index first, as tuples as above
+    def records(self,first=0):
+        mv=memoryview(self.data)[RDSB_HDR.size+first*self.rec.size:RDSB_HDR.size+self.count*self.rec.size]
+        return self.rec.iter_unpack(mv)
+
+    def close(self):
+        if hasattr(self.data,'close'): self.data.close()
+
+
+# index of the first record at or after ms since start; records are in time order
+def rdsb_find(r,ms):
+    lo,hi=0,r.count
+    while lo<hi:
+      mid=(lo+hi)//2
+      if r.record(mid)[0]<ms: lo=mid+1
+      else: hi=mid
+    return lo
+
+
+# stream starts with RDSB magic; f is a buffered binary stream
+def rdsb_detect(f):
+    try: return f.peek(4)[:4]==RDSB_MAGIC
+    except (AttributeError,OSError): return False
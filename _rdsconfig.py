@@ -0,0 +1,47 @@
+
+# hardware and program configuration, shared by the commandline and the mode modules
+
+HARDWARE='raspi' # raspberry pi
+#HARDWARE='none'  # no gpio reset pulse
+# later here will be USB for usb-i2c and others
+
+I2C_BUS=1      # 0 for ancient raspberry pi, 1 for newer, other for usb-i2c or other platforms
+
+# for raspi:
+PIN_RESET=23   # BCM pin for reset, on common modules mandatory for initializing the chip to I2C
+#PIN_IRQ=24     # BCM pin for interrupt, optional
+PIN_IRQ=-1     # disable interrupt
+
+
+RDS_RBDS=0  # 0=RDS, 1=RBDS
+
+
+#INITFREQ=1050
+ONCRASH_OFF=False # switch off radio on program crash?
+
+# filtering of scrolling groups, = means "only"
+RDS_FILTERS=[ [], ['0A','2A'], ['=2A'],['=3A'],['=8A'] ]
+
+# interactive status line repaints per second at most, 0 = whenever it changes
+STATUS_REFRESH=20
+
+
+
+
+# scan limits
+FREQ_FROM=875        # STATION:  87.5  8    [________]  499
+FREQ_TO=1080         # STATION: 108.0  2    [________]  499
+
+Si4703_I2C_ADDR=0x10 # 0x10 by default
+
+# tuners for the parallel scan, (I2C bus, BCM reset pin) each; the address is fixed, so one chip per bus
+# (extra buses e.g. with dtoverlay=i2c-gpio); with more than one the band is split among them
+TUNERS=[(I2C_BUS,PIN_RESET)]
+
+# station database, written by scans and when leaving a station in interactive mode
+STATIONS_DB='~/.si4703rds-stations.sqlite'
+
+# MQTT broker for interactive mode --mqtt, topics <prefix>/freq, .../ps, commands on <prefix>/cmd
+MQTT_HOST='localhost'
+MQTT_PORT=1883
+MQTT_PREFIX='si4703rds'
@@ -0,0 +1,351 @@
+
+# full-screen curses dashboard (dash): fixed panes instead of the scrolling log
+#   station   frequency, RSSI, stereo, PI, PTY, PS, RT (or group counts, g), RT+, clock, ODA
+#   groups    counts and share by type, rates over the last seconds; reads, duplicates, lost
+#   AF/EON    alternative frequency lists, other networks
+#   TMC       traffic messages as the t key lists them
+#   raw       scrolling raw groups, paused and filtered as the interactive log
+# a pane is redrawn only when its key (the state it shows) changes; all changed panes go out in one doupdate,
+# at most STATUS_REFRESH times per second. Keys as in interactive mode (help_interactive), ? s t r S open a
+# full-screen view, the same key or Esc closes it
+
+import curses
+from time import sleep, monotonic, strftime
+from collections import deque
+from io import StringIO
+from contextlib import redirect_stdout
+
+from _rdsconfig import ONCRASH_OFF, RDS_FILTERS, STATUS_REFRESH, RDS_RBDS
+from _rdslists import RDS_RBDS_PTY_TYPES
+from _rdsutil import fmtfreq, timing_mark
+from _rdsradio import getradio, printreg, printvol, radio_verb, RADIO_VERBS
+from _rdsmodes import stations_scan
+from _rdsstations import db_station_save, db_preset_step
+from _rdsinteractive import help_interactive
+import _rdsdecoder as dec
+
+DASH_RATEWINDOW=10   # seconds group rates are averaged over
+DASH_RAWLINES=200    # raw group rows kept
+DASH_HINT='q quit  ? help  [ ] seek  < > stations  - + volume  f filter  space pause  s strings  t TMC'
+
+
+# what a printing function prints, as lines; progress lines ending in CR keep their last state
+def dash_capture(f,*args,**kw):
+    b=StringIO()
+    with redirect_stdout(b): f(*args,**kw)
+    return [l.rstrip('\r').split('\r')[-1] for l in b.getvalue().splitlines()]
+
+
+class dash_pane(object):
+    def __init__(self,title,key,lines):
+        self.title=title  # text, or function returning it
+        self.keyf=key     # function returning the state the content depends on
+        self.linesf=lines # function(rows) returning the content as lines
+        self.win=None
+        self.key=None
+
+    def place(self,y,x,h,w):
+        self.win=None
+        self.key=None
+        if h<3 or w<8: return # no room
+        try: self.win=curses.newwin(h,w,y,x)
+        except curses.error: pass
+
+    # into the window buffer if the key changed; True if the screen needs an update
+    def draw(self):
+        if self.win==None: return False
+        k=self.keyf()
+        if k==self.key: return False
+        self.key=k
+        w=self.win
+        h,wd=w.getmaxyx()
+        w.erase()
+        w.box()
+        title=self.title() if callable(self.title) else self.title
+        w.addnstr(0,2,f' {title} ',wd-4)
+        for i,l in enumerate(self.linesf(h-2)[:h-2]):
+          w.addnstr(1+i,1,l,wd-2)
+        w.noutrefresh()
+        return True
+
+
+class dashboard(object):
+    def __init__(self,radio,remotes=[]):
+        self.radio=radio
+        self.remotes=remotes
+        self.channel=radio.si4703GetChannel()
+        self.showrds=True      # raw pane running
+        self.showgrpstat=False # group counts instead of RT
+        self.outfixed=False    # raw pane: PTY, TP of block B
+        self.filteridx=0
+        self.rdsskipgrp=[]
+        self.rdsonlygrp=[]
+        self.raw=deque(maxlen=DASH_RAWLINES)
+        self.rawseq=0
+        self.rates=deque(maxlen=DASH_RATEWINDOW+1) # (time, group counts by type, bad groups), once a second
+        self.tsample=0
+        self.tnext=0
+        self.interval=1/STATUS_REFRESH if STATUS_REFRESH>0 else 0
+        self.msg=''
+        self.msgshown=None
+        self.overlay=None
+        self.radio_off=ONCRASH_OFF
+        self.panes=[dash_pane('station',self.station_key,self.station_lines),
+                    dash_pane('groups',self.stats_key,self.stats_lines),
+                    dash_pane('AF/EON',self.afeon_key,self.afeon_lines),
+                    dash_pane('TMC',self.tmc_key,self.tmc_lines),
+                    dash_pane(self.raw_title,self.raw_key,self.raw_lines)]
+
+    ###  pane contents
+
+    def station_key(self):
+        return (self.channel,self.radio.si4703_registers[self.radio.SI4703_STATUSRSSI]&0x1ff,dec.rds_cnt[0]-dec.rds_cnt[1],self.showgrpstat)
+
+    def station_lines(self,n):
+        r=self.radio
+        pty=dec.rds_pty
+        l=[fmtfreq(self.channel,pad=' ')+f' MHz  RSSI {r.si4703getRssi():2}  '+
+           ['mono','stereo'][(r.si4703_registers[r.SI4703_STATUSRSSI]>>r.SI4703_STEREO)&1]+
+           (f'  PI {dec.rds_pic:04X}' if dec.rds_pic>=0 else '')+
+           (f'  PTY {pty} {RDS_RBDS_PTY_TYPES[pty][RDS_RBDS]}' if pty>=0 else ''),
+           'PS '+dec.rds_getmem('0A')+'    clock '+dec.rds_mem['lclock'],
+           'groups ['+dec.getrdsgrpstat()+']' if self.showgrpstat else 'RT '+dec.rds_getmem('2')]
+        if dec.rds_rtplus['item']!={}: l.append('RT+ '+dec.rds_rtplus_str())
+        if dec.rds_odagrps: l.append('ODA '+'  '.join(f'[{g} {dec.rds_getodagrpname(g,threshold=0)}]' for g in dec.rds_odagrps))
+        return l
+
+    def stats_key(self):
+        return (self.channel,int(monotonic()))
+
+    def stats_lines(self,n):
+        rate={}
+        if len(self.rates)>1:
+          (t0,g0,b0),(t1,g1,b1)=self.rates[0],self.rates[-1]
+          for i in range(32):
+            if g1[i]!=g0[i]: rate[dec.getrdsgtype(i>>1,i&1)]=(g1[i]-g0[i])/(t1-t0)
+          rate['--']=(b1-b0)/(t1-t0)
+        c=dec.rds_cnt
+        l=[f'reads {c[0]}  dup {c[1]}  lost {c[3]}',' type   count share   /s']
+        tot=sum(dec.rds_stat.values())
+        for x in dec.stat_getsorted():
+          k=dec.rds_stat[x]
+          if k==0: continue
+          l.append(f'{x:>5} {k:7} {100*k/tot:4.1f}% {rate.get(x,0):5.2f}')
+        return l
+
+    def afeon_key(self):
+        g=dec.rds_grpcnt
+        return (self.channel,g[0],g[28],g[29],int(monotonic()/5)) # 0A, 14A, 14B; EON ages
+
+    def afeon_lines(self,n):
+        l=[f'{x.pi:04x}@'+dec.rds_af_str(x) for x in dec.rds_af_lists(None)]
+        return l+[x.strip() for x in dash_capture(dec.rds_eon_show)]
+
+    def tmc_key(self):
+        return (self.channel,len(dec.rds_tmclist),sum(t['cnt'] for t in dec.rds_tmclist.values()),int(monotonic()/10)) # ages
+
+    def tmc_lines(self,n):
+        return dash_capture(dec.rds_tmclist_show)
+
+    def raw_title(self):
+        if not self.showrds: return 'raw <paused>'
+        if self.rdsskipgrp!=[]: return 'raw <filtered:'+','.join(self.rdsskipgrp)+'>'
+        return 'raw'
+
+    def raw_key(self):
+        return (self.rawseq,self.showrds,self.filteridx)
+
+    def raw_lines(self,n):
+        return list(self.raw)[-n:]
+
+    # row for a new group in the raw pane, unless paused or filtered
+    def raw_add(self,rds,corr):
+        if not self.showrds: return
+        if corr[1]<2: gt=dec.getrdsgtype(rds[1]>>12,(rds[1]>>11)&1)
+        else: gt='--'
+        if self.rdsonlygrp!=[] and gt not in self.rdsonlygrp: return
+        if gt in self.rdsskipgrp: return
+        h=dec.RDS_HEX
+        s=strftime('%H:%M:%S')+f' {corr[0]}{corr[1]}{corr[2]}{corr[3]}  '+' '.join(h[x>>8]+h[x&255] if c<3 else '----' for x,c in zip(rds,corr))
+        if self.outfixed and gt!='--': s+=f'  TP={(rds[1]>>10)&1} PTY={(rds[1]>>5)&31:2}'
+        self.raw.append(s+'  '+dec.rdslist_get_grpdesc(gt))
+        self.rawseq+=1
+
+    ###  screen
+
+    def layout(self,scr):
+        H,W=scr.getmaxyx()
+        scr.erase()
+        scr.noutrefresh()
+        station,stats,afeon,tmc,raw=self.panes
+        y=7
+        rest=max(0,H-1-y)
+        hm=max(3,rest//3)
+        ht=max(3,rest//4)
+        ws=min(36,W//2)
+        station.place(0,0,min(y,H-1),W)
+        stats.place(y,0,hm,ws)
+        afeon.place(y,ws,hm,W-ws)
+        tmc.place(y+hm,0,ht,W)
+        raw.place(y+hm+ht,0,H-1-(y+hm+ht),W)
+        if self.overlay!=None: self.overlay.place(0,0,H-1,W)
+        try: self.msgwin=curses.newwin(1,W,H-1,0)
+        except curses.error: self.msgwin=None
+        self.msgshown=None
+
+    def draw(self):
+        if self.overlay!=None: self.overlay.draw()
+        else:
+          for pn in self.panes: pn.draw()
+        m=self.msg or DASH_HINT
+        if self.msgwin!=None and m!=self.msgshown:
+          self.msgshown=m
+          self.msgwin.erase()
+          self.msgwin.addnstr(0,0,m,self.msgwin.getmaxyx()[1]-1,curses.A_REVERSE)
+          self.msgwin.noutrefresh()
+        curses.doupdate()
+
+    # full-screen view of printed text: toggled by its key, live ones rebuilt every second
+    def show(self,scr,title,lines,live=False):
+        if self.overlay!=None and self.overlay.title==title: self.close(scr);return
+        self.overlay=dash_pane(title,(lambda: int(monotonic())) if live else (lambda: 0),lambda n: lines())
+        self.layout(scr)
+
+    def close(self,scr):
+        self.overlay=None
+        self.layout(scr)
+
+    def retune(self):
+        self.channel=self.radio.si4703GetChannel()
+        dec.rds_retune(self.channel)
+
+    ###  loop
+
+    def readgroup(self):
+        n=dec.rds_cnt[0]-dec.rds_cnt[1]
+        dec.handlerds(self.channel,self.radio,out=False)
+        if dec.rds_cnt[0]-dec.rds_cnt[1]==n: return # re-read
+        self.raw_add(*self.radio.getrds())
+
+    def run(self,scr):
+        try: curses.curs_set(0)
+        except curses.error: pass
+        scr.nodelay(True)
+        scr.keypad(True)
+        self.layout(scr)
+        radio=self.radio
+        while True:
+          sleep(0.002)
+          radio.si4703ReadRegisters()
+          if radio.isrds(): self.readgroup()
+          for r in self.remotes: r.update(self.channel,radio)
+
+          t=monotonic()
+          if t>=self.tsample:
+            self.tsample=t+1
+            self.rates.append((t,dec.rds_grpcnt[:],dec.rds_cnt[2]))
+          if t>=self.tnext:
+            self.tnext=t+self.interval
+            self.draw()
+
+          c=scr.getch()
+          if c==curses.KEY_RESIZE: self.layout(scr);continue
+          cmd=chr(c) if 0<c<256 else ''
+          for r in self.remotes:
+            if cmd=='': cmd=r.command()
+          if cmd=='': continue
+          if not self.command(scr,cmd): break
+
+    # keypress; False to quit. Chip and station functions print their results, the last line is shown
+    def command(self,scr,cmd):
+        radio=self.radio
+        out=StringIO()
+        with redirect_stdout(out):
+          if cmd==' ':
+              self.showrds=not self.showrds
+          elif cmd=='?':
+              self.show(scr,'help',lambda: dash_capture(help_interactive))
+          elif cmd in ['[',']']:
+              db_station_save(self.channel,radio.si4703getRssi())
+              if cmd=='[': radio.si4703SeekDown()
+              else: radio.si4703SeekUp()
+              self.retune()
+          elif cmd in ['<','>',',','.']:
+              c=db_preset_step(self.channel,[1,-1][cmd in '<,'])
+              if c==0: print('no known stations, scan with S')
+              else:
+                db_station_save(self.channel,radio.si4703getRssi())
+                radio.si4703SetChannel(c)
+                self.retune()
+          elif cmd=='-':
+              radio.si4703SetVolume(radio.si4703GetVolume()-1)
+              printvol(radio)
+          elif cmd=='+' or cmd=='=':
+              radio.si4703SetVolume(radio.si4703GetVolume()+1)
+              printvol(radio)
+          elif cmd=='f' or cmd=='F':
+              if cmd=='F': self.filteridx=0
+              else: self.filteridx=(self.filteridx+1)%len(RDS_FILTERS)
+              self.rdsskipgrp=RDS_FILTERS[self.filteridx]
+              self.rdsonlygrp=[x[1:] for x in self.rdsskipgrp if x[0]=='=']
+              if self.rdsskipgrp==[]: print('--- filter off')
+              else:                   print('--- filter on:',self.rdsskipgrp)
+          elif cmd=='g':
+              self.showgrpstat=not self.showgrpstat
+          elif cmd=='h':
+              self.outfixed=not self.outfixed
+          elif cmd=='s':
+              self.show(scr,'strings',lambda: dash_capture(dec.printmemstat),live=True)
+          elif cmd=='t':
+              self.show(scr,'TMC',lambda: dash_capture(dec.rds_tmclist_show),live=True)
+          elif cmd=='r':
+              regs=dash_capture(printreg,radio)
+              self.show(scr,'registers',lambda: regs)
+          elif cmd=='i':
+              radio.si4703Init()
+              self.retune()
+          elif cmd=='I':
+              radio.si4703ShutDown(verb=False)
+              print('radio off')
+          elif cmd in RADIO_VERBS:
+              radio_verb(radio,cmd)
+          elif cmd=='S':
+              self.msg='scanning'
+              self.draw()
+              scan=dash_capture(stations_scan,radio)
+              self.retune()
+              self.show(scr,'scan',lambda: scan)
+          elif cmd in ['q','Q']:
+              db_station_save(self.channel,radio.si4703getRssi())
+              self.radio_off=cmd=='q'
+              return False
+          elif cmd in ['\x1b','\n'] and self.overlay!=None:
+              self.close(scr)
+        lines=[l for l in out.getvalue().replace('\r','\n').splitlines() if l.strip()]
+        self.msg=lines[-1].strip() if lines else ''
+        return True
+
+
+# dashboard mode; arguments as interactive mode main()
+def main(init=False,deinit=ONCRASH_OFF,remotes=[]):
+    dec.rds_initstr()
+    radio=getradio()
+    if init or not radio.si4703isInitialized(): radio.si4703Init()
+    else: radio.si4703InitPwr()
+    timing_mark('chip init')
+    d=dashboard(radio,remotes)
+    d.radio_off=deinit
+    dec.rds_retune(d.channel)
+    try:
+      curses.wrapper(d.run)
+      print()
+      dec.printmemstat()
+    except KeyboardInterrupt:
+      d.radio_off=False
+      print("Exiting program")
+    finally:
+      if d.radio_off:
+        print("Shutting down radio")
+        radio.si4703ShutDown(verb=False)
+      else: print("Exiting, keeping radio")
+      print()
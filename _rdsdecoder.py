@@ -0,0 +1,1661 @@
+
+# RDS decoder library: group parsing, decoded state, statistics, RDS-Spy log parsing
+# no hardware access here; the chip-facing code is in _rdsradio.py, the commandline in si4703rds.py
+
+from time import monotonic,time
+from sys import stdin, stdout
+
+# RDS_ODA_AID, RDS_GTYPE_desc
+from _rdslists import ODAAID_TMC, ODAAID_RTPLUS, RDS_ODAAID_names, RDS_ODA_AID, RDS_GTYPE_desc, RDSPLUS_TAGS, RDS_RBDS_PTY_TYPES, RDS_PI_AREADESC
+from _rdsconfig import RDS_RBDS
+from _rdsutil import getbit, getbits, getbits_long, rds_to_raw, natsort, p, hexstr, ints2str, int2str, hexpayload, fmtfreq, getchanrssi, printchanrssi
+# _rds_tmc_events is large, loaded on first decoded TMC message, see rds_tmc_events()
+
+VERB=False # extra verbosity/debug data, set from commandline
+rds_evhook=None # called after every accepted group with (group type, blocks, corrections, good blocks), see _rdsjson.py
+
+
+# 105.0  R-VLTAVA   0a, 2a, 14a, 14b
+#                   GTYPE=14B:EON_B        10:232d:232f
+# 102.5  RADIO F1   0a, 1a, 2a, 4a   # GTYPE=4A:clock         01:d6db:2c02    at nov21,1948
+#  99.7  Bonton     0a, 1a?, 2a, 4a?   WEAK
+#  98.7  CLASSIC    0a, 2a, (14a - rare?)
+#  96.6   IMPULS    0a, 2a
+#  95.7   SIGNAL    0a, 2a
+#  95.3    BEAT     0a, 2a, 10a(always spaces)
+#  94.6  R-ZURNAL   0a, 1a, 2a, 3a, 4a, 8a (JSDI)
+#                   GTYPE=3A:openDataAppId 10:0647:cd46 grp=8A msg=0647 appId=cd46(RDS-TMC ALERT-C)
+#                   GTYPE=8A:TMC           05:c9ed:28b0 usermsg
+#                   GTYPE=1A:progItemNoSlo 02:0000:0000
+#                   GTYPE=8A:TMC           05:4964:6000 usermsg
+#                   GTYPE=8A:TMC           0f:c2e7:64e3 usermsg 1grp dur=7 diversion=1 dir=1 scale=0 event=74302e7 loc=c2e7 multigrp firstblk=1
+#                   GTYPE=4A:clock         01:d6de:1780    # nov23,0130
+#  93.7  CITY 937   0a, 2a, 3a, 11a
+#                   GTYPE=3A:openDataAppId 16:0000:4bd7 grp=11A msg=0000 appId=4bd7
+#                   GTYPE=11A              18:2b94:2013
+#                   GTYPE=3A:openDataAppId 16:0000:4bd7 grp=11A msg=0000 appId=4bd7
+#                   GTYPE=11A              18:2e1c:2018
+# (92.6) CROplus    0a, 1a, 2a, 3a, 8a? (PRG-only)   4a? 01:d6d2:5e40
+#                   GTYPE=3A:openDataAppId 10:4080:cd46 grp=8A msg=4080 appId=cd46
+#                   GTYPE=8A:TMC           06:0000:0000 usermsg
+#                   GTYPE=8A:TMC           07:cabd:11f7 usermsg
+#                   GTYPE=8A:TMC           07:cabd:a1a3 usermsg
+#                   GTYPE=8A:TMC           07:51a2:ac00 usermsg
+#  903   EXPRESFM   0a, 2a, 4a?
+#  895   COUNTRY    0a, 2a, 10a (all spaces)
+
+
+
+# http://www.interactive-radio-system.com/docs/EN50067_RDS_Standard.pdf
+# https://www.ni.com/docs/en-US/bundle/rfmx-waveform-creator/page/rds-common-parameters.html
+# https://scdn.rohde-schwarz.com/ur/pws/dl_downloads/dl_common_library/dl_manuals/gb_1/s/digital_standards_for_signal_generators/RS_SigGen_FM_Stereo-RDS_OperatingManual_en_11.pdf
+
+# http://www.g.laroche.free.fr/english/rds/groupes/listeGroupesRDS.htm
+
+# 0A: basic tuning
+# xtype: TA MS DI c1 c0    TA=traffic-announce,1=traffic; MS=music/speech, DI[c]=decoder info, c1/c0=subaddress
+#    DI[0]=mono/stereo,1=stereo
+#    DI[1]=head,1=artificial head
+#    DI[2]=compress,1=compressed
+#    DI[3]=PTY,0=static,1=dynamic
+# grp3=AF, alt-freq; AF1/AF0, 8bit numbers; 0=unused, 1..204=87.5+n/10 MHz, 
+# grp4=PS, service name - double chars, addressed by c1:c0
+
+
+
+"""
+monitoring RDS...
+1050  232d:e0fd:0800:232f {'PIC': '232d', 'B0': 0, 'TP': 0, 'PTY': 7, 'VARY': '1d', 'GTYPE': '14A:EON         '} TPon=1 var=13 DATA=0800 PIon=232f
+1050  232d:e0f0:2020:232f {'PIC': '232d', 'B0': 0, 'TP': 0, 'PTY': 7, 'VARY': '10', 'GTYPE': '14A:EON         '} TPon=1 var=0 DATA=b'  ' PIon=232f
+1050  232d:e0f1:4352:232f {'PIC': '232d', 'B0': 0, 'TP': 0, 'PTY': 7, 'VARY': '11', 'GTYPE': '14A:EON         '} TPon=1 var=1 DATA=b'CR' PIon=232f
+1050  232d:e0f2:2031:232f {'PIC': '232d', 'B0': 0, 'TP': 0, 'PTY': 7, 'VARY': '12', 'GTYPE': '14A:EON         '} TPon=1 var=2 DATA=b' 1' PIon=232f
+1050  232d:e0f3:2020:232f {'PIC': '232d', 'B0': 0, 'TP': 0, 'PTY': 7, 'VARY': '13', 'GTYPE': '14A:EON         '} TPon=1 var=3 DATA=b'  ' PIon=232f
+1050  232d:e0f4:e616:232f {'PIC': '232d', 'B0': 0, 'TP': 0, 'PTY': 7, 'VARY': '14', 'GTYPE': '14A:EON         '} TPon=1 var=4 DATA=b'\xe6\x16' PIon=232f
+1050  232d:e0f4:7522:232f {'PIC': '232d', 'B0': 0, 'TP': 0, 'PTY': 7, 'VARY': '14', 'GTYPE': '14A:EON         '} TPon=1 var=4 DATA=b'u"' PIon=232f
+1050  232d:e0f4:e616:232f {'PIC': '232d', 'B0': 0, 'TP': 0, 'PTY': 7, 'VARY': '14', 'GTYPE': '14A:EON         '} TPon=1 var=4 DATA=b'\xe6\x16' PIon=232f
+1050  232d:e0f4:7522:232f {'PIC': '232d', 'B0': 0, 'TP': 0, 'PTY': 7, 'VARY': '14', 'GTYPE': '14A:EON         '} TPon=1 var=4 DATA=b'u"' PIon=232f
+1050  232d:e0f4:38cd:232f {'PIC': '232d', 'B0': 0, 'TP': 0, 'PTY': 7, 'VARY': '14', 'GTYPE': '14A:EON         '} TPon=1 var=4 DATA=b'8\xcd' PIon=232f
+1050  232d:e0fd:0800:232f {'PIC': '232d', 'B0': 0, 'TP': 0, 'PTY': 7, 'VARY': '1d', 'GTYPE': '14A:EON         '} TPon=1 var=13 DATA=0800 PIon=232f
+1050  232d:e0f0:2020:232f {'PIC': '232d', 'B0': 0, 'TP': 0, 'PTY': 7, 'VARY': '10', 'GTYPE': '14A:EON         '} TPon=1 var=0 DATA=b'  ' PIon=232f
+1050  232d:e0f1:4352:232f {'PIC': '232d', 'B0': 0, 'TP': 0, 'PTY': 7, 'VARY': '11', 'GTYPE': '14A:EON         '} TPon=1 var=1 DATA=b'CR' PIon=232f
+1050  232d:e0f2:2031:232f {'PIC': '232d', 'B0': 0, 'TP': 0, 'PTY': 7, 'VARY': '12', 'GTYPE': '14A:EON         '} TPon=1 var=2 DATA=b' 1' PIon=232f
+1050  232d:e0f4:e616:232f {'PIC': '232d', 'B0': 0, 'TP': 0, 'PTY': 7, 'VARY': '14', 'GTYPE': '14A:EON         '} TPon=1 var=4 DATA=b'\xe6\x16' PIon=232f
+1050  232d:e0f4:7522:232f {'PIC': '232d', 'B0': 0, 'TP': 0, 'PTY': 7, 'VARY': '14', 'GTYPE': '14A:EON         '} TPon=1 var=4 DATA=b'u"' PIon=232f
+1050  232d:e0f4:e616:232f {'PIC': '232d', 'B0': 0, 'TP': 0, 'PTY': 7, 'VARY': '14', 'GTYPE': '14A:EON         '} TPon=1 var=4 DATA=b'\xe6\x16' PIon=232f
+1050  232d:40e1:d6db:16c0 {'PIC': '232d', 'B0': 0, 'TP': 0, 'PTY': 7, 'VARY': '01', 'GTYPE': '4A:clock        '} 01:d6db:16c0
+1050  232d:e0f4:5447:232f {'PIC': '232d', 'B0': 0, 'TP': 0, 'PTY': 7, 'VARY': '14', 'GTYPE': '14A:EON         '} TPon=1 var=4 DATA=b'TG' PIon=232f
+1050  232d:e0f4:7522:232f {'PIC': '232d', 'B0': 0, 'TP': 0, 'PTY': 7, 'VARY': '14', 'GTYPE': '14A:EON         '} TPon=1 var=4 DATA=b'u"' PIon=232f
+1050  232d:e0f4:38cd:232f {'PIC': '232d', 'B0': 0, 'TP': 0, 'PTY': 7, 'VARY': '14', 'GTYPE': '14A:EON         '} TPon=1 var=4 DATA=b'8\xcd' PIon=232f
+1050  232d:e0fd:0800:232f {'PIC': '232d', 'B0': 0, 'TP': 0, 'PTY': 7, 'VARY': '1d', 'GTYPE': '14A:EON         '} TPon=1 var=13 DATA=0800 PIon=232f
+1050  232d:e0f0:2020:232f {'PIC': '232d', 'B0': 0, 'TP': 0, 'PTY': 7, 'VARY': '10', 'GTYPE': '14A:EON         '} TPon=1 var=0 DATA=b'  ' PIon=232f
+1050  232d:e0f1:4352:232f {'PIC': '232d', 'B0': 0, 'TP': 0, 'PTY': 7, 'VARY': '11', 'GTYPE': '14A:EON         '} TPon=1 var=1 DATA=b'CR' PIon=232f
+1050  232d:e0f3:2020:232f {'PIC': '232d', 'B0': 0, 'TP': 0, 'PTY': 7, 'VARY': '13', 'GTYPE': '14A:EON         '} TPon=1 var=3 DATA=b'  ' PIon=232f
+1050  232d:e0f4:5447:232f {'PIC': '232d', 'B0': 0, 'TP': 0, 'PTY': 7, 'VARY': '14', 'GTYPE': '14A:EON         '} TPon=1 var=4 DATA=b'TG' PIon=232f
+1050  232d:e0f4:7522:232f {'PIC': '232d', 'B0': 0, 'TP': 0, 'PTY': 7, 'VARY': '14', 'GTYPE': '14A:EON         '} TPon=1 var=4 DATA=b'u"' PIon=232f
+1050  232d:e0f4:38cd:232f {'PIC': '232d', 'B0': 0, 'TP': 0, 'PTY': 7, 'VARY': '14', 'GTYPE': '14A:EON         '} TPon=1 var=4 DATA=b'8\xcd' PIon=232f
+1050  232d:e0f4:e616:232f {'PIC': '232d', 'B0': 0, 'TP': 0, 'PTY': 7, 'VARY': '14', 'GTYPE': '14A:EON         '} TPon=1 var=4 DATA=b'\xe6\x16' PIon=232f
+1050  232d:e0f4:5447:232f {'PIC': '232d', 'B0': 0, 'TP': 0, 'PTY': 7, 'VARY': '14', 'GTYPE': '14A:EON         '} TPon=1 var=4 DATA=b'TG' PIon=232f
+1050  232d:e0f4:7522:232f {'PIC': '232d', 'B0': 0, 'TP': 0, 'PTY': 7, 'VARY': '14', 'GTYPE': '14A:EON         '} TPon=1 var=4 DATA=b'u"' PIon=232f
+1050  232d:e0fd:0800:232f {'PIC': '232d', 'B0': 0, 'TP': 0, 'PTY': 7, 'VARY': '1d', 'GTYPE': '14A:EON         '} TPon=1 var=13 DATA=0800 PIon=232f
+1050  232d:e0f1:4352:232f {'PIC': '232d', 'B0': 0, 'TP': 0, 'PTY': 7, 'VARY': '11', 'GTYPE': '14A:EON         '} TPon=1 var=1 DATA=b'CR' PIon=232f
+1050  232d:e0f3:2020:232f {'PIC': '232d', 'B0': 0, 'TP': 0, 'PTY': 7, 'VARY': '13', 'GTYPE': '14A:EON         '} TPon=1 var=3 DATA=b'  ' PIon=232f
+1050  232d:e0f4:e616:232f {'PIC': '232d', 'B0': 0, 'TP': 0, 'PTY': 7, 'VARY': '14', 'GTYPE': '14A:EON         '} TPon=1 var=4 DATA=b'\xe6\x16' PIon=232f
+1050  232d:e0f4:5447:232f {'PIC': '232d', 'B0': 0, 'TP': 0, 'PTY': 7, 'VARY': '14', 'GTYPE': '14A:EON         '} TPon=1 var=4 DATA=b'TG' PIon=232f
+1050  232d:e0f4:7522:232f {'PIC': '232d', 'B0': 0, 'TP': 0, 'PTY': 7, 'VARY': '14', 'GTYPE': '14A:EON         '} TPon=1 var=4 DATA=b'u"' PIon=232f
+1050  232d:e0f4:38cd:232f {'PIC': '232d', 'B0': 0, 'TP': 0, 'PTY': 7, 'VARY': '14', 'GTYPE': '14A:EON         '} TPon=1 var=4 DATA=b'8\xcd' PIon=232f
+1050  232d:e0f4:e616:232f {'PIC': '232d', 'B0': 0, 'TP': 0, 'PTY': 7, 'VARY': '14', 'GTYPE': '14A:EON         '} TPon=1 var=4 DATA=b'\xe6\x16' PIon=232f
+1050  232d:e0f4:7522:232f {'PIC': '232d', 'B0': 0, 'TP': 0, 'PTY': 7, 'VARY': '14', 'GTYPE': '14A:EON         '} TPon=1 var=4 DATA=b'u"' PIon=232f
+done
+
+RT+:
+ 93.7 12  0000  2032:3556:0000:4bd7  PIC=2032 TP=1 PTY=10 VARY=16  GTYPE=3A:openDataAppId 16:0000:4bd7 grp=11A msg=0000 appId=4bd7(RT+)
+ 93.7 13  0000  2032:b548:299c:200f  PIC=2032 TP=1 PTY=10 VARY=08  GTYPE=11A:oda-freeform 08:299c:200f
+ 93.7 12  0000  2032:3556:0000:4bd7  PIC=2032 TP=1 PTY=10 VARY=16  GTYPE=3A:openDataAppId 16:0000:4bd7 grp=11A msg=0000 appId=4bd7(RT+)
+ 93.7 12  0000  2032:b548:299c:200f  PIC=2032 TP=1 PTY=10 VARY=08  GTYPE=11A:oda-freeform 08:299c:200f
+ 93.7 12  0000  2032:3556:0000:4bd7  PIC=2032 TP=1 PTY=10 VARY=16  GTYPE=3A:openDataAppId 16:0000:4bd7 grp=11A msg=0000 appId=4bd7(RT+)
+ 93.7 13  "CITY 937" R  2A 0234b  "ENRIQUE IGLESIAS - Can You Hear Me                              " <filtered:0A,2A>
+
+
+"""
+
+########################
+##
+##  RDS helper functions
+##
+########################
+
+# RDS string array
+rds_mem={}            # string arrays for groups
+rds_stat={}           # statistics, {'0A':20,'2A':21,...}
+rds_qgrps=set()       # quickview set of groups, ('0','2','8','8^',...)
+rds_qgrpscnt={}       # quickview count of groups, {'2':12,'8^':1,...) - duplicated stats, for filtering of status line groups show
+rds_odagrps={}        # ODA-assigned groups, {'8A':'TMC',...}
+rds_odagrpscnt={}     # ODA-assigned group count {'8A':34}
+rds_pty=-1            # PTY
+rds_pic=-1            # PIC
+
+def rds_stat_reset():
+  global rds_stat,rds_qgrps,rds_qgrpscnt,rds_odagrps,rds_odagrpscnt,rds_pty,rds_pic
+  rds_stat={'--':0}
+  rds_qgrps=set()
+  rds_qgrpscnt={}
+  rds_odagrps={}
+  rds_odagrpscnt={}
+  rds_oda_reset()
+  rds_pty=-1            # PTY
+  rds_pic=-1            # PIC
+
+def rds_stat_add(name,grp,b0):
+  if name in rds_stat: rds_stat[name]+=1
+  else: rds_stat[name]=1
+  rds_add_quickqgroups(grp,b0)
+
+
+# quickgroups list add
+def rds_add_quickqgroups(grp,b0):
+  if grp<0: return
+  if b0:
+    if grp<10: c=f'{grp:x}^'
+    else: c=f'{grp:X}'
+  else: c=f'{grp:x}'
+  rds_qgrps.add(c)
+  if c in rds_qgrpscnt: rds_qgrpscnt[c]+=1
+  else: rds_qgrpscnt[c]=1
+
+# quickgroups list
+def rds_get_quickgroups():
+  #return ''.join(sorted(rds_qgrps))  # fast and dumb
+  tot=sum(rds_qgrpscnt.values())
+  if tot==0: return ''
+  s=''
+  for x in sorted(rds_qgrps):
+    #s+=x
+    if rds_qgrpscnt[x]/tot > 0.03: s+=x
+  return s
+
+
+
+# init RDS strings
+def rds_initstr(initchar=b'_'):
+  global rds_mem
+  rds_stat_reset()
+  rds_mem['0A'] =bytearray(initchar*8)
+  rds_mem['DI']=bytearray(initchar*4)
+  rds_mem['2']  =bytearray(initchar*64)
+  rds_mem['PTYN'] =bytearray(initchar*8)
+  rds_mem['TMCID'] =bytearray(initchar*8)
+  rds_mem['clock']='?'
+  rds_mem['lclock']='?'
+  rds_tmclist_reset()
+  rds_rtplus_reset()
+  rds_eon_reset()
+  rds_af_reset()
+  rds_dup_reset()
+  rds_tentative_reset()
+
+def rds_tentative_reset():
+  global rds_tentative,rds_cache_psmask
+  rds_tentative=set()
+  rds_cache_psmask=0
+
+# set ODAAID for group, from 3A
+def rds_setodagrp(grp,val):
+  if grp in rds_odagrps and rds_odagrps[grp]==val: rds_tentative.discard('ODA')
+  if grp in rds_odagrpscnt: rds_odagrpscnt[grp]+=1
+  else: rds_odagrpscnt[grp]=1
+  rds_odagrps[grp]=val
+  rds_oda_bind()
+
+# get ODAAID for group
+def rds_getodagrp(g,threshold=0.02):
+  #threshold=0.05 # at least 5%
+  if g in rds_odagrps and g in rds_odagrpscnt:
+    # make sure we do not get confused by noise-induced false data
+    if rds_odagrpscnt[g]/sum(rds_odagrpscnt.values())>=threshold: return rds_odagrps[g]
+  return ''
+
+# get desc for group's ODA assignment
+def rds_getodagrpname(g,threshold=0.05):
+  gn=rds_getodagrp(g,threshold=threshold);
+  if gn=='': return ''
+  s=f'0x{gn:04X}'
+  if gn in RDS_ODAAID_names: s+='('+RDS_ODAAID_names[gn]+')'
+  #if gn==ODAAID_TMC: s+='(TMC)'
+  #elif gn==ODAAID_RTPLUS: s+='(RT+)'
+  return s
+
+
+
+# set character char in RDS string [name] at pos
+def rds_setstrraw(name,char,pos):
+  if int(char)<0x20: char=0x40
+  try: rds_mem[name][pos]=char
+  except Exception as e: print('EXCEPT:',e,'name:',name,'len:',len(rds_mem[name]),'pos:',pos)
+
+# print memory string
+def rds_getmem(name,quot='"'):
+  s=rds_mem[name]
+  if name in rds_tentative and quot!='': quot='~' # restored from cache, not received yet
+  if isinstance(s,str): return s.replace('\r','\\r')
+  try: return quot+s.decode('utf-8').replace('\r','\\r')+quot
+  except: return str(rds_mem[name]).replace('bytearray','')
+
+def rds_printmem(name):
+  p(rds_getmem(name))
+
+# insert two chars encoded as 16bit integer into string, print the string
+def rds_setstr(name,val,pos,out=True):
+  rds_setstrraw(name,val>>8  ,pos*2)
+  rds_setstrraw(name,val&0xff,pos*2+1)
+  if out: rds_printmem(name)
+
+# insert four chars encoded as two 16bit integers into string, print the string
+# okc/okd: take only the half from a trusted block
+def rds_setstr2(name,val1,val2,pos,out=True,okc=True,okd=True):
+  if okc:
+    rds_setstrraw(name,val1>>8  ,pos*4)
+    rds_setstrraw(name,val1&0xff,pos*4+1)
+  if okd:
+    rds_setstrraw(name,val2>>8  ,pos*4+2)
+    rds_setstrraw(name,val2&0xff,pos*4+3)
+  if out: rds_printmem(name)
+
+def rds_setstrstr(name,val):
+  rds_mem[name]=val
+
+
+
+
+# get RDS group string from group ID and A/B bit
+def getrdsgtype(g,b0):
+  return str(g)+['A','B'][b0]
+
+
+
+def rdslist_get_ODA_AID_name(aid):
+  if aid in RDS_ODA_AID: return '('+RDS_ODA_AID[aid]+')'
+  return ''
+
+def rdslist_get_grpdesc(grpname):
+    # https://www.2wcom.com/fileadmin/redaktion/dokumente/Company/RDS_Basics.pdf
+    if grpname in RDS_GTYPE_desc: return grpname+':'+RDS_GTYPE_desc[grpname]
+    return grpname
+    #if s=='8A': return grpname+':TMC'
+    #return grpname
+
+
+
+# get alternate frequency from byte to string
+def rds_byte2freq(b):
+    if b==0: return '[unused]'
+    if b<206: return fmtfreq(875+b)
+    if b==206: return '[fill]'
+    if b==224: return '[noAF]'
+    if b>224 and b<250: return '[follow:'+str(b-224)+']'
+    if b==250: return '[follow:1LFMF]'
+    return '[unassigned]'
+
+
+
+
+
+###################################
+##
+##  RDS clock, group 4A
+##
+###################################
+
+RDS_CLOCK_DISCIPLINE=False # timestamp dumps by the broadcast clock instead of host clock, for hosts without RTC/NTP
+
+rds_clock=None            # broadcast clock tracking, {'offs':bcast-monotonic,'wall':bcast-time,'drift':s/s,...}
+rds_mjdcache=(-1,(0,0,0)) # last converted modified julian day, the date changes once a day
+
+# modified julian day to year,month,day; integer-only, Fliegel-Van Flandern on julian day number
+def mjd_to_date(mjd):
+    global rds_mjdcache
+    if mjd==rds_mjdcache[0]: return rds_mjdcache[1]
+    l=mjd+2400001+68569
+    n=(4*l)//146097
+    l=l-(146097*n+3)//4
+    i=(4000*(l+1))//1461001
+    l=l-(1461*i)//4+31
+    j=(80*l)//2447
+    day=l-(2447*j)//80
+    l=j//11
+    month=j+2-12*l
+    year=100*(n-49)+i+l
+    rds_mjdcache=(mjd,(year,month,day))
+    return year,month,day
+
+# decode 4A group to modified julian day, UTC hour and minute, local offset in minutes
+def rds_clock_decode(rds):
+    mjd=((rds[1]&0x03)<<15)|(rds[2]>>1)
+    hr=((rds[2]&0x01)<<4)|(rds[3]>>12)
+    mn=(rds[3]>>6)&0x3f
+    offs=(rds[3]&0x1f)*30 # signed half-hours
+    if rds[3]&0x20: offs=-offs
+    return mjd,hr,mn,offs
+
+# apply local offset in minutes, carry over midnight
+def rds_clock_local(mjd,hr,mn,offs):
+    t=hr*60+mn+offs
+    return mjd+t//1440,(t%1440)//60,t%60
+
+# get clock as string
+def rds_clock_str(mjd,hr,mn):
+    yr,mon,day=mjd_to_date(mjd)
+    return f'{yr}-{mon:02}-{day:02} {hr:02}:{mn:02}'
+
+# track offset of the broadcast clock against host monotonic and wall clocks
+# the 4A group ends at the minute edge, a single group is good to about 0.1s plus the polling delay
+def rds_clock_sync(mjd,hr,mn):
+    global rds_clock
+    if hr>23 or mn>59: return # corrupted group
+    bcast=(mjd-40587)*86400+hr*3600+mn*60 # unix time of the minute edge
+    mono=monotonic()
+    offs=bcast-mono
+    c=rds_clock
+    if c!=None and abs(offs-c['offs'])>30: # corrupted group, or the station clock jumped; resync only when the next group confirms
+      if c['pending']==None or abs(offs-c['pending'])>2: c['pending']=offs;return
+      c=None
+    if c==None:
+      rds_clock={'offs':offs,'first':offs,'firstmono':mono,'mono':mono,'wall':bcast-time(),'drift':0.0,'n':1,'pending':None}
+      return
+    c['n']+=1
+    c['offs']+=(offs-c['offs'])/min(c['n'],8) # average out the per-group jitter
+    c['mono']=mono
+    c['wall']=bcast-time()
+    c['pending']=None
+    if mono-c['firstmono']>600: c['drift']=(c['offs']-c['first'])/(mono-c['firstmono'])
+
+# sync the clock from raw group, if it is a good 4A; for dump paths that do not run the full decoder
+def rds_clock_syncraw(rds,corr):
+    if rds[1]>>11!=0x08: return # not 4A
+    if corr[1]>1 or corr[2]>1 or corr[3]>1: return
+    mjd,hr,mn,_=rds_clock_decode(rds)
+    rds_clock_sync(mjd,hr,mn)
+
+# current time, unix seconds; from broadcast clock if disciplining is on and synced
+def rds_clock_now():
+    c=rds_clock
+    if not RDS_CLOCK_DISCIPLINE or c==None: return time()
+    mono=monotonic()
+    return mono+c['offs']+c['drift']*(mono-c['mono'])
+
+
+
+
+###################################
+##
+##  EON, enhanced other networks, groups 14A/14B
+##
+###################################
+
+from array import array
+
+# one other network, compact; PS and frequencies as raw bytes/AF codes
+class rds_eon_entry(object):
+    __slots__=('pi','ps','af','mapped','mappedam','pty','tp','ta','pin','cnt','seen')
+    def __init__(self,pi):
+        self.pi=pi
+        self.ps=bytearray(b'_'*8)
+        self.af=array('B')      # AF codes, method A list
+        self.mapped=array('B')  # mapped frequency pairs, AF codes: tuned,other,tuned,other...
+        self.mappedam=array('B') # mapped AM frequency pairs, tuned AF code, other LF/MF code
+        self.pty=-1
+        self.tp=-1
+        self.ta=-1
+        self.pin=-1
+        self.cnt=0
+        self.seen=0
+
+rds_eon={}        # other networks by PI(ON)
+rds_eon_ta=set()  # PI(ON) with traffic announcement running
+
+def rds_eon_reset():
+    global rds_eon,rds_eon_ta
+    rds_eon={}
+    rds_eon_ta=set()
+
+# get entry for PI(ON), create if new
+def rds_eon_get(pi):
+    e=rds_eon.get(pi)
+    if e==None: e=rds_eon[pi]=rds_eon_entry(pi)
+    e.cnt+=1
+    e.seen=monotonic()
+    return e
+
+def rds_eon_setta(e,ta):
+    e.ta=ta
+    if ta: rds_eon_ta.add(e.pi)
+    else: rds_eon_ta.discard(e.pi)
+
+# add AF code to array, unique; skip fillers and list headers
+def rds_eon_addaf(arr,b):
+    if b==0 or b>204: return
+    if b not in arr: arr.append(b)
+
+# 14A, variant in VARY[3..0]: 0-3 PS, 4 AF, 5-9 mapped freqs, 12 linkage, 13 PTY+TA, 14 PIN
+def rds_eon_add14A(rds):
+    VARY=rds[1]&0x1f
+    var=VARY&0x0f
+    e=rds_eon_get(rds[3])
+    e.tp=getbit(VARY,4)
+    c=rds[2]
+    if var<4: # same control-char masking as rds_setstrraw()
+      e.ps[var*2]=c>>8 if c>>8>=0x20 else 0x40
+      e.ps[var*2+1]=c&0xff if c&0xff>=0x20 else 0x40
+    elif var==4:
+      rds_eon_addaf(e.af,c>>8)
+      rds_eon_addaf(e.af,c&0xff)
+    elif var<=9: # mapped frequencies, tuned network freq and other network freq; 9 other network on LF/MF
+      tn=c>>8;on=c&0xff
+      m=e.mapped if var<9 else e.mappedam
+      if tn==0 or tn>204 or on==0 or (on>204 if var<9 else rds_af_lfmf(on)==0): return e
+      for x in range(0,len(m),2):
+        if m[x]==tn and m[x+1]==on: return e
+      m.append(tn);m.append(on)
+    elif var==13:
+      e.pty=getbits(c,11,5)
+      rds_eon_setta(e,getbit(c,0))
+    elif var==14:
+      e.pin=c
+    return e
+
+# 14B, TA switching of other network
+def rds_eon_add14B(rds):
+    e=rds_eon_get(rds[3])
+    e.tp=getbit(rds[1],4)
+    rds_eon_setta(e,getbit(rds[1],3))
+    return e
+
+# other networks with traffic announcement running
+def rds_eon_talist():
+    return [rds_eon[x] for x in rds_eon_ta]
+
+# mapped frequency of other network for given tuned frequency code, 0 if none
+def rds_eon_mapped(e,tn):
+    for x in range(0,len(e.mapped),2):
+      if e.mapped[x]==tn: return e.mapped[x+1]
+    return 0
+
+def rds_eon_show(mincnt=2):
+    now=monotonic()
+    for pi in sorted(rds_eon):
+      e=rds_eon[pi]
+      if e.cnt<mincnt: continue # noise-induced PI
+      p(f'  EON {pi:04x} "'+e.ps.decode('utf-8','replace')+'"')
+      if e.pty>=0: p(f' PTY={e.pty}')
+      p(f' TP={e.tp}')
+      if e.ta>=0: p(f' TA={e.ta}')
+      if e.pin>=0: p(' PIN='+hexstr(e.pin))
+      if len(e.af)>0: p(' AF='+','.join(fmtfreq(875+x,pad=' ').strip() for x in sorted(e.af)))
+      if len(e.mapped)>0: p(' mapped='+','.join(fmtfreq(875+e.mapped[x],pad=' ').strip()+'>'+fmtfreq(875+e.mapped[x+1],pad=' ').strip() for x in range(0,len(e.mapped),2)))
+      if len(e.mappedam)>0: p(' mapped='+','.join(fmtfreq(875+e.mappedam[x],pad=' ').strip()+f'>{rds_af_lfmf(e.mappedam[x+1])}kHz' for x in range(0,len(e.mappedam),2)))
+      p(f' {e.cnt}x {round(now-e.seen)}s')
+      print()
+
+
+
+
+###################################
+##
+##  AF, alternative frequencies, group 0A
+##
+###################################
+
+# AF list for one PI, keyed by the frequency from its header pair: tuned frequency for method B,
+# first AF for method A (by convention the tuned one, too); FM as channels (875+code), LF/MF in kHz
+class rds_aflist(object):
+    __slots__=('pi','chan','method','count','fm','fmcnt','fmreg','am','amcnt','tot','inF','outF','tent')
+    def __init__(self,pi,chan):
+        self.pi=pi
+        self.chan=chan
+        self.method=''          # 'A', 'B', '' while undecided
+        self.count=0            # list length from the header code
+        self.fm=array('H')      # channels
+        self.fmcnt=array('H')   # times seen, parallel to fm
+        self.fmreg=array('B')   # method B: 1 for regional variant, parallel to fm
+        self.am=array('H')      # LF/MF, kHz
+        self.amcnt=array('H')
+        self.tot=0              # frequencies received
+        self.inF=0              # pairs containing the header freq, method B detection
+        self.outF=0             # pairs without it
+        self.tent=False         # restored from cache, header not received since
+
+rds_af={}         # AF lists by (PI, header channel)
+rds_afcur=None    # list being received
+rds_aflfmf=False  # code 250 ended the last pair, next code is LF/MF
+
+def rds_af_reset():
+    global rds_af,rds_afcur,rds_aflfmf
+    rds_af={}
+    rds_afcur=None
+    rds_aflfmf=False
+
+# LF/MF code to kHz, 9 kHz raster: 1-15 LF from 153 kHz, 16-135 MF from 531 kHz
+def rds_af_lfmf(b):
+    if b>=1 and b<=15: return 153+(b-1)*9
+    if b>=16 and b<=135: return 531+(b-16)*9
+    return 0
+
+# count value in parallel arrays, append if new; halve all counts on saturation; returns index
+def rds_af_count(arr,cnt,v,w=1):
+    try: i=arr.index(v)
+    except ValueError:
+      arr.append(v);cnt.append(w)
+      return len(arr)-1
+    if cnt[i]+w>0xffff:
+      for x in range(len(cnt)): cnt[x]>>=1
+    cnt[i]+=w
+    return i
+
+def rds_af_addfm(l,c,reg=0,w=1):
+    i=rds_af_count(l.fm,l.fmcnt,c,w)
+    if i==len(l.fmreg): l.fmreg.append(reg)
+    elif reg: l.fmreg[i]=1
+    l.tot+=1
+
+# AF code pair from block C of 0A, w=weight by block correction level
+def rds_af_pair(b1,b2,pi,w=1):
+    global rds_afcur,rds_aflfmf
+    lfmf=rds_aflfmf
+    rds_aflfmf=b2==250
+    if b1>224 and b1<250: # header: count, then tuned freq (B) or first AF (A)
+      if b2==0 or b2>204: return
+      k=(pi,875+b2)
+      l=rds_af.get(k)
+      if l==None: l=rds_af[k]=rds_aflist(pi,875+b2)
+      l.count=b1-224
+      l.tent=False
+      rds_af_addfm(l,875+b2,w=w)
+      rds_afcur=l
+      return
+    l=rds_afcur
+    if l==None or l.pi!=pi: return # list start not seen yet
+    if b1==250 or lfmf: # LF/MF follows
+      f=rds_af_lfmf(b2 if b1==250 else b1)
+      if f:
+        rds_af_count(l.am,l.amcnt,f,w)
+        l.tot+=1
+      if b1==250: return
+      b1=0
+    c1=875+b1 if b1>0 and b1<205 else 0 # 205 filler, rest unassigned
+    c2=875+b2 if b2>0 and b2<205 else 0
+    if c1 and c2:
+      inF=c1==l.chan or c2==l.chan
+      if inF: l.inF+=1
+      else: l.outF+=1
+      if l.inF+l.outF>=2: l.method='B' if l.inF>l.outF*4 else 'A'
+      # method B: tuned freq in every pair, descending order means regional variant
+      if inF and l.method!='A':
+        rds_af_addfm(l,c2 if c1==l.chan else c1,int(c1>c2),w)
+        return
+    if c1 and c1!=l.chan: rds_af_addfm(l,c1,w=w)
+    if c2 and c2!=l.chan: rds_af_addfm(l,c2,w=w)
+
+# indexes of entries seen at least a quarter as often as the most frequent one
+def rds_af_filter(cnt):
+    if len(cnt)==0: return []
+    lim=max(max(cnt)>>2,1 if max(cnt)<2 else 2)
+    return [i for i in range(len(cnt)) if cnt[i]>=lim]
+
+# filtered FM channels of list, ascending
+def rds_af_channels(l):
+    return sorted(l.fm[i] for i in rds_af_filter(l.fmcnt))
+
+# AF lists of PI (None for all) with enough data, the ones for current PI and channel first
+def rds_af_lists(pi,chan=0,mintot=2):
+    r=[rds_af[k] for k in sorted(rds_af) if (pi==None or k[0]==pi) and rds_af[k].tot>=mintot]
+    r.sort(key=lambda l:(l.pi!=rds_pic,l.chan!=chan))
+    return r
+
+# list as text: header freq, method, AFs (r=regional variant), announced count
+def rds_af_str(l):
+    s=fmtfreq(l.chan,pad=' ').strip()+' '+(l.method or '?')+['',' (tentative)'][l.tent]+':'
+    for c in rds_af_channels(l):
+      if c==l.chan: continue
+      s+=' '+fmtfreq(c,pad=' ').strip()
+      if l.method=='B' and l.fmreg[l.fm.index(c)]: s+='r'
+    for i in rds_af_filter(l.amcnt): s+=f' {l.am[i]}kHz'
+    return s+f' count={l.count}'
+
+
+###################################
+##
+##  station state cache, for retune
+##
+###################################
+
+# decoded state of a station worth keeping across retunes; restored values are tentative until received again
+# no PTY: the restore runs on a group with a good block B, which has just set it
+class rds_cache_entry(object):
+    __slots__=('ps','odagrps','odagrpscnt','af')
+    def __init__(self):
+        self.ps=bytes(rds_mem['0A'])
+        self.odagrps=dict(rds_odagrps)
+        self.odagrpscnt={x:min(rds_odagrpscnt[x],RDS_CACHE_ODACNT) for x in rds_odagrpscnt} # capped, a changed assignment takes over quickly
+        self.af=[rds_af[k] for k in rds_af if k[0]==rds_pic]
+
+RDS_CACHE_SIZE=32     # stations kept, least recently used dropped
+RDS_CACHE_ODACNT=3    # restored ODA assignment count
+RDS_CACHE_MINGRPS=10  # groups received before the state is worth keeping
+
+rds_cache={}          # entries by (channel, PI), in use order, oldest first
+rds_cache_chan=0      # tuned channel, 0 = unknown (log replay), no caching
+rds_cache_pending=False # waiting for the first good PI after retune
+rds_tentative=set()   # restored, not yet confirmed: '0A', 'ODA'
+rds_cache_psmask=0    # PS segments received since retune
+
+# save state of current station
+def rds_cache_save():
+    if rds_cache_chan==0 or rds_pic<0: return
+    if sum(rds_stat.values())-rds_stat.get('--',0)<RDS_CACHE_MINGRPS: return
+    k=(rds_cache_chan,rds_pic)
+    rds_cache.pop(k,None)
+    rds_cache[k]=rds_cache_entry()
+    if len(rds_cache)>RDS_CACHE_SIZE: del rds_cache[next(iter(rds_cache))]
+
+# restore state for PI on the tuned channel
+def rds_cache_restore(pi):
+    global rds_cache_pending
+    rds_cache_pending=False
+    e=rds_cache.pop((rds_cache_chan,pi),None)
+    if e==None: return False
+    rds_cache[(rds_cache_chan,pi)]=e # most recently used
+    rds_mem['0A'][:]=e.ps
+    rds_tentative.add('0A')
+    if e.odagrps!={}:
+      rds_odagrps.update(e.odagrps)
+      rds_odagrpscnt.update(e.odagrpscnt)
+      rds_tentative.add('ODA')
+      rds_oda_bind()
+    for l in e.af:
+      l.tent=True
+      rds_af[(l.pi,l.chan)]=l
+    return True
+
+# PS segment received, the whole name is confirmed when all four are fresh
+def rds_cache_ps(addr):
+    global rds_cache_psmask
+    rds_cache_psmask|=1<<addr
+    if rds_cache_psmask==15: rds_tentative.discard('0A')
+
+# keep state of the station left, clear decoder, restore on first PI from the new channel
+def rds_retune(channel):
+    global rds_cache_chan,rds_cache_pending
+    rds_cache_save()
+    rds_initstr()
+    rds_cache_chan=channel
+    rds_cache_pending=channel!=0
+
+
+# whole decoder state of the tuned station, for time-sliced monitoring of several stations (_rdsmonitor.py):
+# taken when the station is left, put back on the next visit; what was being received in several groups
+# (TMC multi-group message, AF list) is not, the groups in between were missed
+RDS_STATE=('rds_mem','rds_stat','rds_qgrps','rds_qgrpscnt','rds_odagrps','rds_odagrpscnt','rds_odadispatch','rds_pty','rds_pic',
+           'rds_tmclist','rds_rtplus','rds_rtab','rds_rtmask','rds_eon','rds_eon_ta','rds_af','rds_recent','rds_tentative','rds_cache_psmask')
+
+# state of the station left, the decoder is cleared
+def rds_state_take():
+    global rds_mem,rds_tmcrecord
+    g=globals()
+    st={x:g[x] for x in RDS_STATE}
+    rds_mem={} # filled in place by rds_initstr()
+    rds_tmcrecord=None
+    rds_initstr()
+    return st
+
+# continue with the state st on channel, or as after a retune if there is none yet
+def rds_state_put(st,channel):
+    global rds_cache_chan,rds_cache_pending
+    if st==None: rds_retune(channel);return
+    globals().update(st)
+    rds_cache_chan=channel
+    rds_cache_pending=False
+
+
+##############################
+##
+##  RDS handling functionality
+##
+##############################
+
+# duplicate suppression: the chip keeps the last group in the registers and RDSR stays set for up to 40 ms,
+# polling is faster, so a group is read several times; a genuine repeat of a group seen k groups back
+# cannot arrive sooner than k group periods after it
+RDS_GROUP_PERIOD=104/1187.5 # 104 bits at 1187.5 bit/s, 87.6 ms
+RDS_DUP_WINDOW=4            # recent groups compared, catches interleaved re-reads
+RDS_DUP_SLACK=0.8           # polling jitter tolerance
+rds_recent=[]               # (acquisition time, group) of accepted groups, newest last
+
+# acquisition counters for the metrics endpoint (_rdsmetrics.py): live reads only, never reset;
+# list slots written only by the acquisition loop, read by the server thread, no locking
+RDS_CNT_BADTHRESHOLD=2      # block B correction level making a group bad, as handlerds() counts '--'
+RDS_LOST_MAXGAP=2.0         # longer gaps between groups are signal loss or retune, not lost groups
+rds_cnt=[0]*4               # reads, duplicate reads, bad groups, estimated lost groups
+rds_grpcnt=[0]*32           # good groups by type, GTYPE*2+B0
+rds_corrhist=[0]*16         # blocks by correction level, block*4+level
+
+def rds_dup_reset():
+    global rds_recent
+    rds_recent=[]
+
+# True for a re-read of a group already accepted; t is the acquisition timestamp
+def rds_isdup(rds,t):
+    n=len(rds_recent)
+    for k in range(1,n+1):
+      tk,g=rds_recent[n-k]
+      if g==rds:
+        if t-tk<k*RDS_GROUP_PERIOD*RDS_DUP_SLACK: return True
+        break
+    rds_recent.append((t,rds))
+    if n>=RDS_DUP_WINDOW: del rds_recent[0]
+    return False
+
+# count a register read for the metrics; tprev: time of the group accepted before,
+# groups missed between two accepted ones are estimated from the gap
+def rds_count(rds,corr,t,tprev,dup):
+    c=rds_cnt
+    c[0]+=1
+    if dup: c[1]+=1;return
+    if tprev>=0 and t-tprev<RDS_LOST_MAXGAP: c[3]+=max(0,round((t-tprev)/RDS_GROUP_PERIOD)-1)
+    h=rds_corrhist
+    h[corr[0]]+=1;h[4+corr[1]]+=1;h[8+corr[2]]+=1;h[12+corr[3]]+=1
+    if corr[1]<RDS_CNT_BADTHRESHOLD: rds_grpcnt[rds[1]>>11]+=1
+    else: c[2]+=1
+
+# group from the chip: (blocks, corrections, True for a re-read), counted
+def rds_read(radio):
+    rds,corr=radio.getrds()
+    t=monotonic()
+    tprev=rds_recent[-1][0] if rds_recent else -1
+    dup=rds_isdup(rds,t)
+    rds_count(rds,corr,t,tprev,dup)
+    return rds,corr,dup
+
+
+
+
+
+
+# take the array of 4 2-bit correction numbers, get thresholds
+def rds_isbad(corr,threshold=2):
+    for x in range(threshold,4):
+      if x in corr: return True
+    return False
+
+# blocks are accepted one by one: B (group type) is required, A (PI) and C, D are used when good;
+# these groups take C and D independently, the others need both
+RDS_BLOCKWISE={'0A','0B','2A','2B','10A'}
+RDS_CORR_WEIGHT=(4,2,1,0) # count weight of a block by correction level: none, 1-2 bits, 3-5 bits, uncorrectable
+
+
+rds_tmcrecord=None
+rds_tmclist={}
+
+# TMC event names table, large, imported only when a TMC message is first decoded
+def rds_tmc_events():
+    from _rds_tmc_events import RDS_TMC_EVENTS
+    return RDS_TMC_EVENTS
+
+def rds_tmclist_reset():
+    global rds_tmclist
+    rds_tmclist={}
+
+def rds_tmclist_add(loc,event,direc,raw,partial=False,out=False):
+    #key=hexstr(loc)+':'+hexstr(event,l=3)+':'+str(direc)
+    key=hexstr(event,l=3)+':'+hexstr(loc)+':'+str(direc)
+    if key in rds_tmclist:
+      if partial:
+        #if out: p(':::PARTIAL')
+        return # allow inserting a partial record if not existing yet
+      cnt=rds_tmclist[key]['cnt']
+    else: cnt=0
+    rds_tmclist[key]={'raw':raw,'when':monotonic(),'cnt':cnt+1}
+
+def rds_tmclist_show():
+    for key in sorted(rds_tmclist.keys()):
+      tmc=rds_tmclist[key]
+      #p(key+' -')
+      p(f'{key} {tmc["cnt"]:3}x ')
+      #p(' '+str(tmc['cnt'])+'x ')
+      age=round(monotonic()-tmc['when'])
+      if(age<60): p(f'{age:2}s')
+      else: p(f'{round(age/60):2}m')
+      p(':')
+      rds_tmc_decode(tmc['raw'],show=True)
+      print()
+
+
+def rds_tmc_decode(rds,out=True,show=False):
+    VARY=getbits(rds[1],0,5)
+    F=getbit(VARY,3) # F bit, 1=singlegrp,0=multigrp
+    D=getbit(rds[2],15)
+    single=F
+    multi_first=D
+    #if not out: return # for now; add caching decoded sentences later
+    if out:
+      #p(' L='+str(len(rds)))
+      if len(rds)==4:
+        p([' m',' S'][single])
+        if not single: p(' 1st')
+        if single: p(' duration=')
+        else: p(' cont=')
+        p(str(getbits(VARY,0,3)))
+      elif show: p(' m')
+    event=getbits(rds[2],0,11)
+    loc=rds[3]
+    direc=getbit(rds[2],14)
+    if not show:
+      if (single or len(rds)>4): rds_tmclist_add(loc,event,direc,rds,out=out,partial=False)
+      else:                      rds_tmclist_add(loc,event,direc,rds,out=out,partial=True)
+    if out:
+      p(' divert='+str(D))
+      p(' dir='+['0','1'][getbit(rds[2],14)])
+      p(' extent='+str(getbits(rds[2],11,3)))
+      #p(' event='+str(event)) # https://github.com/bastibl/gr-rds/blob/maint-3.10/lib/tmc_events.h
+      p(' event='+f'{event:4}') # https://github.com/bastibl/gr-rds/blob/maint-3.10/lib/tmc_events.h
+      #p('/x'+hexstr(getbits(rds[2],0,11),l=3)) # https://github.com/bastibl/gr-rds/blob/maint-3.10/lib/tmc_events.h
+      p(' loc='+hexstr(loc))
+#      if single or len(rds)>4:
+      events=rds_tmc_events()
+      if event in events: p(' ['+events[event]+']')
+    if not out: return # only output follows
+    if len(rds)==4:
+      if F==0: p(' [PARTIAL]')
+      return # only first group
+
+    # decode additional data here
+    bitstr=''
+    for t in range(2,int(len(rds)/2)):
+      #p(':');p(hexstr(rds[2*t],l=3))
+      #p(':');p(hexstr(rds[2*t+1]))
+      bitstr+=f'{rds[2*t]:012b}{rds[2*t+1]:016b}'
+    #p(bitstr)
+    #print()
+    label_len=[3, 3, 5, 5, 5, 8, 8, 8, 8, 11, 16, 16, 16, 16, 0, 0]
+    auxarr=[]
+    dataarr=[]
+    #print();print(bitstr)
+    while bitstr!='':
+      label=int(bitstr[:4],2)
+      if label==0: break
+      bitstr=bitstr[4:]
+      l=label_len[label]
+      databitstr=bitstr[:l]
+      auxarr.append(f'{label}={l}:{databitstr}')
+      try: data=int(databitstr,2)
+      except: data=0
+      bitstr=bitstr[l:]
+      #print('  label',label,'len',l,'data',data,databitstr)
+      if label==15: continue
+      if label==0 and data==0: continue
+      dataarr.append(data)
+    p(' aux='+str(dataarr).replace(' ',''))
+    if VERB: p(' '+str(auxarr))
+
+
+def rds_tmcreset():
+    global rds_tmcrecord
+    rds_tmcrecord={'raw':[],'contid':-1,'seqid':-1,'num':0}
+
+def rds_tmcadd(rds,isfirst,out=True):
+    if rds_tmcrecord==None or isfirst: rds_tmcreset()
+    VARY=getbits(rds[1],0,5)
+    if isfirst:
+      rds_tmcrecord['contid']=getbits(VARY,0,3)
+      rds_tmcrecord['num']=1
+      rds_tmcrecord['raw']=rds.copy()
+      return
+    if rds_tmcrecord['contid']!=getbits(VARY,0,3): return # skipped
+    is2nd=getbit(rds[2],14) # second
+    seqid=getbits(rds[2],12,2)
+    if is2nd and rds_tmcrecord['num']!=1 and seqid!=0: return
+    if is2nd:
+      rds_tmcrecord['num']=2
+      rds_tmcrecord['seqid']=seqid
+      rds_tmcrecord['raw'].append(rds[2]&0xfff)
+      rds_tmcrecord['raw'].append(rds[3])
+      if seqid==0: # finished multigroup
+        rds_tmc_decode(rds_tmcrecord['raw'],out=out)
+        return
+    if rds_tmcrecord['seqid']-1 != seqid: return
+    rds_tmcrecord['seqid']=seqid
+    rds_tmcrecord['raw'].append(rds[2]&0xfff)
+    rds_tmcrecord['raw'].append(rds[3])
+    if seqid==0: # finished multigroup
+      rds_tmc_decode(rds_tmcrecord['raw'],out=out)
+
+
+# 8A or other group assigned to TMC
+def rds_tmc_group(rds,VARY,out=True):
+    #if out: p(' '+hexpayload(rds))
+    if out: p(' ODA:TMC:')
+    T=getbit(VARY,4) # T bit, 1=TuningInfo,0=UserMessage
+    F=getbit(VARY,3) # F bit, 1=singlegrp,0=multigrp
+    D=getbit(rds[2],15)
+    #p('+');p(T);p(F);p(D)
+    if T==1:
+      var=VARY&0x0F
+      if out:
+        p(' tuningInfo')
+        p(' var='+str(var))
+        if var==4 or var==5: #
+          p(' info='+ints2str(rds[2],rds[3]))
+      if var==4 or var==5:
+        if out: p(' ')
+        rds_setstr2('TMCID',rds[2],rds[3],var-4,out=out)
+      if out:
+        if var==6: p(': specific freqs for same RDS-TMC on stations with different PI code') # todo: add frequencies
+        if var==7: p(': mapped freq pairs to use if tuned to tuning freq')
+        if var==8: p(': up to 2 PI codes for adjanced networks') # carrying the same RDS-TMC service on all transmitters of the network
+        if var==9: p(': PI codes of networks with different system parameters')
+    else:
+      #if out: # no memory processing, just showing data
+        if out: p(' msg')
+        #p([' multi',' single'][F])
+        if F==1 or D==1:
+          rds_tmc_decode(rds,out=out)
+          rds_tmcadd(rds,True,out=out)
+        else:
+          if out:
+            if getbit(rds[2],14): p(' 2nd')
+            else: p(' 3r+')
+            p(' cont='+str(getbits(VARY,0,3)))
+            #p(' 2ndGrp='+str(getbit(rds[2],14))) # msbC&0x40
+            p(' seq='+str(getbits(rds[2],12,2)))
+            #if getbits(rds[2],12,2)==0: p('(complete)')
+            p(' data='+hexstr(rds[2],l=3)+':'+hexstr(rds[3]))
+          rds_tmcadd(rds,False,out=out)
+
+# TMC message bits of 3A, system information
+# https://github.com/bastibl/gr-rds/blob/maint-3.10/lib/parser_impl.cc
+def rds_tmc_msg(msg,out=True):
+    varcode=(msg>>14)&3
+    #if corrsum==0: rds_setodagrp(odagrp,'TMC')
+    #rds_odagrps[odagrp]='TMC'
+    if out: p(' varcode='+str(varcode))
+    if varcode==0:
+      if out:
+        p(' loctable='+hexstr((msg>>6)&0x3f))
+        p(' altfreq='+str(getbit(msg,5)))
+        p(' transmode='+str(getbit(msg,4)))
+        p(' internat='+str(getbit(msg,3)))
+        p(' national='+str(getbit(msg,2)))
+        p(' regional='+str(getbit(msg,1)))
+        p(' urban='+str(getbit(msg,0)))
+    elif varcode==1:
+      g=(msg>>12)&3
+      if out:
+        p(' gap='+str(g))
+        p('(=>'+['3','5','8','11'][g]+')')
+        p(' serviceId='+hexstr((msg>>6)&0x3f))
+
+
+# RT+, radiotext plus: tags pointing into the 2A radiotext, https://tech.ebu.ch/docs/techreview/trev_307-radiotext.pdf
+rds_rtab=-1      # 2A text A/B flag, change means new radiotext
+rds_rtmask=0     # 2A segments received since the last A/B change, one bit per 4-char segment
+rds_rtplus=None  # RT+ state, {'toggle':item toggle,'running':item running,'tags':[(type,start,len)],'item':{tagname:text},'seq':changes}
+
+def rds_rtplus_reset():
+    global rds_rtplus,rds_rtab,rds_rtmask
+    rds_rtab=-1
+    rds_rtmask=0
+    rds_rtplus={'toggle':-1,'running':0,'tags':[],'item':{},'seq':0}
+
+# record received 2A segment, returns True when the radiotext was restarted
+# ok: both halves of the text trusted (C and D), otherwise only the A/B flag of block B counts
+def rds_rt_add(ab,addr,ok=True):
+    global rds_rtab,rds_rtmask
+    new=ab!=rds_rtab
+    if new: # tags refer to the old text
+      new=rds_rtab!=-1
+      rds_rtab=ab
+      rds_rtmask=0
+      rds_rtplus['tags']=[]
+    if ok: rds_rtmask|=1<<addr
+    return new
+
+# are all radiotext chars in [start,end) received since the last A/B change
+def rds_rt_complete(start,end):
+    mask=((1<<((end-1)//4+1))-1) ^ ((1<<(start//4))-1)
+    return rds_rtmask&mask==mask
+
+# add RT+ group data, tags as [(contenttype,start,lengthmarker)]; returns True if the current item changed
+def rds_rtplus_add(toggle,running,tags):
+    r=rds_rtplus
+    if toggle!=r['toggle']: # new programme item, forget the old one
+      r['toggle']=toggle
+      if r['item']!={}: r['item']={};r['seq']+=1
+    r['running']=running
+    r['tags']=[x for x in tags if x[0]!=0] # 0=dummy, unused tag
+    return rds_rtplus_apply()
+
+# cut the tagged strings out of the radiotext, update the current item; returns True if changed
+def rds_rtplus_apply():
+    r=rds_rtplus
+    item=r['item']
+    new=None
+    for ctype,start,leng in r['tags']:
+      end=start+leng+1 # length marker is the length minus one
+      if end>64 or not rds_rt_complete(start,end): continue
+      name=RDSPLUS_TAGS[ctype]
+      if not r['running'] and name.startswith('item_'): continue # no item running, eg. talk between songs
+      val=rds_mem['2'][start:end].decode('utf-8','replace').replace('\r','').strip()
+      if val=='' or item.get(name)==val: continue
+      if new==None: new=dict(item)
+      new[name]=val
+    if not r['running']:
+      for name in item:
+        if name.startswith('item_'):
+          if new==None: new=dict(item)
+          new.pop(name,None)
+    if new==None: return False
+    r['item']=new
+    r['seq']+=1
+    return True
+
+# current item as string, eg. "item_artist=... item_title=..."
+def rds_rtplus_str():
+    if rds_rtplus['item']=={}: return '-'
+    return ' '.join(f'{x}="{rds_rtplus["item"][x]}"' for x in sorted(rds_rtplus['item']))
+
+
+# group assigned to RT+
+def rds_rtplus_group(rds,VARY,out=True):
+    arr=rds_to_raw(rds)
+    toggle=getbits_long(arr,36,1)
+    running=getbits_long(arr,35,1)
+    tags=[(getbits_long(arr,29,6),getbits_long(arr,23,6),getbits_long(arr,17,6)),
+          (getbits_long(arr,11,6),getbits_long(arr,5,6),getbits_long(arr,0,5))]
+    changed=rds_rtplus_add(toggle,running,tags)
+    if out:
+      p(' ODA:RT+:')
+      p(' toggle='+str(toggle))
+      p(' run='+str(running))
+      for x in range(0,2):
+        conttype,start,leng=tags[x]
+        p(f' tag{x+1}={conttype}({RDSPLUS_TAGS[conttype]})@{start}[{leng}]')
+      if changed: p(' RT+item: '+rds_rtplus_str())
+
+# RT+ message bits of 3A
+def rds_rtplus_msg(msg,out=True):
+    #if corrsum==0: rds_setodagrp(odagrp,'RT+')
+    #rds_odagrps[odagrp]='RT+'
+    if out:
+      p(' rfu='+hexstr(msg>>13,l=1))
+      p(' cb='+str(getbit(msg,12)))
+      p(' scb=x'+hexstr(getbits(msg,8,4),l=1))
+      p(' template=x'+hexstr(getbits(msg,0,8),l=2))
+
+
+###################################
+##
+##  ODA, open data applications
+##
+###################################
+
+# decoder of one ODA: group(rds,VARY,out) decodes the assigned group, msg(msg,out) the message bits of 3A
+class rds_oda(object):
+    __slots__=('name','group','msg')
+    def __init__(self,name,group=None,msg=None):
+        self.name=name
+        self.group=group
+        self.msg=msg
+
+RDS_ODA={}          # registry of decoders by AID
+rds_odadispatch={}  # groups bound to a decoder by accepted 3A assignment, {'8A':rds_oda}; unknown AIDs are never bound
+
+def rds_oda_register(aid,name,group=None,msg=None):
+    RDS_ODA[aid]=rds_oda(name,group,msg)
+
+def rds_oda_reset():
+    global rds_odadispatch
+    rds_odadispatch={'8A':RDS_ODA[ODAAID_TMC]} # 8A is TMC unless assigned otherwise
+
+# rebind assigned groups, after the assignment counts changed
+def rds_oda_bind():
+    for g in rds_odagrps:
+      h=RDS_ODA.get(rds_getodagrp(g))
+      if h!=None and h.group!=None: rds_odadispatch[g]=h
+      elif g=='8A' and rds_getodagrp(g)=='': rds_odadispatch[g]=RDS_ODA[ODAAID_TMC] # 8A assigned to another AID is not TMC
+      else: rds_odadispatch.pop(g,None)
+
+rds_oda_register(ODAAID_TMC,'TMC',rds_tmc_group,rds_tmc_msg)
+rds_oda_register(0xCD45,'TMC',rds_tmc_group,rds_tmc_msg) # RDS-TMC ALERT-C test
+rds_oda_register(ODAAID_RTPLUS,'RT+',rds_rtplus_group,rds_rtplus_msg)
+rds_oda_reset()
+
+
+# handle RDS message, filter, parse data to show
+def handlerds(channel,r,skipgrp=[],onlygrp=[],raw=None,rawcorr=None,corrthreshold=2,out=True,outfixed=True,eraseline='',lastgrp=''):
+    global rds_pty,rds_pic
+
+    if raw!=None:
+      rds=raw
+      corr=rawcorr or [0,0,0,0]
+
+    else:
+      rds,corr,dup=rds_read(r)
+      if dup:
+        #print('dup')
+        return False,lastgrp
+
+    PIC=rds[0]
+    GTYPE=rds[1]>>12
+#    B0=(rds[1] & 0x0800) >> 11
+#    TP=(rds[1] & 0x0400) >> 10
+    B0=getbit(rds[1],11)
+    TP=getbit(rds[1],10)
+#    xPTY=(rds[1]>>5)&0x1F
+#    xVARY=rds[1]&0x1F
+    PTY=getbits(rds[1],5,5)
+    VARY=getbits(rds[1],0,5)
+    gtypestr=getrdsgtype(GTYPE,B0)
+    corrsum=sum(corr)
+    okblk=[c<corrthreshold for c in corr]
+    okgrp=okblk[1] and (gtypestr in RDS_BLOCKWISE or (okblk[2] and okblk[3]))
+    if okblk[1]:
+      rds_pty=PTY
+      if okblk[0]:
+        rds_pic=PIC
+        if rds_cache_pending and corr[0]==0: rds_cache_restore(PIC)
+      elif B0 and okblk[2]: rds_pic=rds[2] # version B repeats PI in block C
+      PIC=rds_pic
+      rds_stat_add(gtypestr,GTYPE,B0)
+    #if not out: return False # count stats but do not show anything
+
+    # group filtering
+    if onlygrp!=[]:
+      if not okgrp: return False,'--' # do not show bad packets in group
+      if gtypestr not in onlygrp: out=False
+    elif skipgrp!=[]:
+      if not okgrp: return False,'--' # do not show bad packets in group
+      if gtypestr in skipgrp: out=False
+
+    # print line prefix, correction flags, return if too corrupted blocks
+    if raw==None:
+      if out:
+        p(eraseline)
+        printchanrssi(channel,r)
+        for i in corr: p(i)
+        p('  '+':'.join(f'{i:04x}' for i in rds)+' ')
+    else: # print raw dump
+      if out: p(':'.join(f'{rds[i]:04x}' if corr[i]<3 else '----' for i in range(4))+' ')
+    if not okgrp: # group ID or data blocks the group needs uncorrectable or suspicious
+      if out: print(' bad blocks, skipping')
+      if not okblk[1]: rds_stat_add('--',-1,0)
+      return out,gtypestr
+
+    # print fixed packet prefixes
+    if out:
+      if outfixed:
+        p(' PIC='+hexstr(PIC))
+        p(' TP='+str(TP))
+        p(' PTY='+str(PTY))
+        p(' VARY='+hexstr(VARY,l=2))
+        p('  GTYPE='+(rdslist_get_grpdesc(gtypestr)+'                          ')[:16])
+      else: p(f' {gtypestr:>3} ')
+
+
+    # individual types handling
+
+    # http://www.g.laroche.free.fr/english/rds/groupes/0/groupe0A.htm
+    if GTYPE==0:
+      addr=getbits(rds[1],0,2)
+      if B0==0: rds_setstrraw('DI',0x30+getbit(rds[1],2),addr);
+      if okblk[3]:
+        rds_setstr('0A',rds[3],addr,out=False)
+        rds_cache_ps(addr)
+      if B0==0 and okblk[2]: # group A
+        rds_af_pair(rds[2]>>8,rds[2]&0xff,PIC,RDS_CORR_WEIGHT[corr[2]])
+      if out:
+        p(' TA='+str(getbit(rds[1],4)))
+        p(' MS='+str(getbit(rds[1],3)))
+        p(' DI='+str(getbit(rds[1],2)))
+        p(' C='+str(addr))
+        if B0==0: # group A
+          p(' ');rds_printmem('0A')
+          if okblk[3]: p(' ['+str(bytes([rds[3]>>8,rds[3]&0xff]))+']')
+          p(' Dx='+rds_mem['DI'].decode('utf-8'))
+          #if B0==0: # group A
+          if okblk[2]:
+            p(' AF='+rds_byte2freq(rds[2]>>8))
+            p(' AF='+rds_byte2freq(rds[2]&0xff))
+        else: # group B
+          p(' PI='+hexstr(rds[2]))
+          # if out: p(   '/'+str(bytes([rds[2]>>8,rds[2]&0xff]))+']')
+          p(' ['+str(bytes([rds[3]>>8,rds[3]&0xff]))+']')
+
+
+    # http://www.g.laroche.free.fr/english/rds/groupes/1/groupe1A.htm
+    elif gtypestr=='1A':
+      if out: p(' '+hexpayload(rds))
+
+
+    elif GTYPE==2: # only either 2A or 2B can be present; 64 or two 32 byte strings
+      addr=getbits(rds[1],0,4)
+      if out: p(' '+('0'+str(addr))[-2:])
+      if out: p(' '+ints2str(rds[2],rds[3]).replace('\r','\\r'))
+      if out: p(' ')
+      rds_setstr2('2',rds[2],rds[3],addr,out=out,okc=okblk[2],okd=okblk[3])
+      if B0==0 and rds_rt_add(getbit(VARY,4),addr,okblk[2] and okblk[3]) and out: p(' [new]')
+      if rds_rtplus['tags']!=[] and rds_rtplus_apply() and out: p(' RT+item: '+rds_rtplus_str())
+
+
+    elif gtypestr=='3A':
+      msg=rds[2]
+      appid=rds[3]
+      odagrp=str(getbits(VARY,1,4))+['A','B'][getbit(VARY,0)]
+
+      if odagrp in rds_odagrps:
+        if corrsum<2: # at most one correction
+          rds_setodagrp(odagrp,appid)
+      else:
+        # for now, force always including to test handling spurious data
+        if True or 2 not in corr and 3 not in corr: rds_setodagrp(odagrp,appid)
+      if out:
+        p(' '+hexpayload(rds))
+        p(' grp=')
+        if VARY==0: p('[0=notcarried]')
+        elif VARY==0x1f: p('[1F=encoderError]')
+        else: p(odagrp)
+          #p(str(getbits(VARY,1,4)))
+          #p(['A','B'][getbit(VARY,0)])
+        p(' msg='+hexstr(msg)) # section 7.5.2.2 of ISO 14819-1
+        p(' appId='+hexstr(appid))
+        p(rdslist_get_ODA_AID_name(appid))
+        #if appid==0xcd45: p('(RDS-TMS ALERT-C test)')
+        #if appid==0xcd46: p('(RDS-TMS ALERT-C)')
+        #if appid==0x4bd7: p('(RT+)') # https://tech.ebu.ch/docs/techreview/trev_307-radiotext.pdf
+
+#APPID_TMC=0xCD46
+#APPID_RTPLUS=0x4BD7
+
+
+      h=RDS_ODA.get(appid)
+      if h!=None:
+        if h.msg!=None: h.msg(msg,out=out)
+      else:
+        #if corrsum==0: rds_setodagrp(odagrp,'0x'+hexstr(appid))
+        if corrsum==0: rds_setodagrp(odagrp,appid)
+    # stop further processing 
+    #elif not out: return False,gtypestr
+
+
+    # http://www.g.laroche.free.fr/english/rds/groupes/4/groupe4A.htm
+    # 1050   5  0000  232d:40e1:d6de:3540  PIC=232d TP=0 PTY=7 VARY=0001 GTYPE=4A:clock         01:d6de:3540 julday=60271 3:21 +0  # 2023-11-23 03:21
+    elif gtypestr=='4A':
+      mjd,hr,mn,offs=rds_clock_decode(rds)
+      s=rds_clock_str(mjd,hr,mn)
+      rds_setstrstr('clock',s)
+      lmjd,lhr,lmn=rds_clock_local(mjd,hr,mn,offs)
+      rds_setstrstr('lclock',rds_clock_str(lmjd,lhr,lmn))
+      if raw==None and corr[1]<2 and corr[2]<2 and corr[3]<2: rds_clock_sync(mjd,hr,mn) # live groups only, log replay has no reception time
+      if out:
+        p(' '+s)
+        p('   offs='+['+','-'][offs<0]+str(abs(offs)//30))
+        p(' julday='+str(mjd))
+        p(' local='+rds_mem['lclock'])
+        #p(' raw='+hexpayload(rds))
+
+    # http://www.g.laroche.free.fr/english/rds/groupes/10/groupe10A.htm
+    elif gtypestr=='10A':
+      addr=VARY&0x01
+      if out:
+        p(' '+['A','B'][getbit(VARY,4)])
+        p(' addr='+str(addr))
+      rds_setstr2('PTYN',rds[2],rds[3],addr,out=out,okc=okblk[2],okd=okblk[3])
+
+    # http://www.g.laroche.free.fr/english/rds/groupes/14/groupe14A.htm
+    elif gtypestr=='14A':
+      addr=VARY&0x0f
+      e=rds_eon_add14A(rds)
+      if out:
+        p(' TPon='+str(getbit(VARY,4)))
+        p(' var='+str(addr))
+        if addr<4:
+          p(' DATA='+int2str(rds[2]))
+        elif addr==4:
+          p(' AFon='+rds_byte2freq(rds[2]>>8))
+          p(' AFon='+rds_byte2freq(rds[2]&0xff))
+        elif addr>=5 and addr<=8:
+          p(' mapped='+rds_byte2freq(rds[2]>>8)+'>'+rds_byte2freq(rds[2]&0xff))
+        elif addr==13:
+          p(' PTYon='+str(getbits(rds[2],11,5)))
+          p(' TAon='+str(getbit(rds[2],0)))
+          p(' data='+hexstr(rds[2]))
+        else:
+          p(' DATA='+hexstr(rds[2]))
+        p(' PIon='+hexstr(rds[3]))
+        if addr<4: p(' PSon="'+e.ps.decode('utf-8','replace')+'"')
+
+    elif gtypestr=='14B':
+      rds_eon_add14B(rds)
+      if out:
+        p(' TPon='+str(getbit(VARY,4)))
+        p(' TAon='+str(getbit(VARY,3)))
+        p(' PIon='+hexstr(rds[3]))
+
+    # after the fixed-purpose groups, a 3A cannot take those over
+    # https://www.automa.cz/cz/casopis-clanky/dynamicka-navigace-ve-vozidle-rds-tmc-2003_07_28880_3079/
+    # http://www.g.laroche.free.fr/english/rds/groupes/8/groupe8A.htm
+    # https://www.vut.cz/www_base/zav_prace_soubor_verejne.php?file_id=116618
+    # https://github.com/gjasny/v4l-utils/blob/master/lib/libv4l2rds/libv4l2rds.c   !!!
+    #elif rds_getodagrp(gtypestr)=='TMC' or  gtypestr=='8A':
+    elif gtypestr in rds_odadispatch: # ODA group with a registered decoder
+      rds_odadispatch[gtypestr].group(rds,VARY,out)
+
+    # https://tech.ebu.ch/docs/techreview/trev_307-radiotext.pdf
+
+    else:
+      if out:
+        p(' '+hexpayload(rds))
+        s=rds_getodagrpname(gtypestr)
+        if s!='': p(' ODAAID='+s)
+
+
+    if rds_evhook!=None: rds_evhook(gtypestr,rds,corr,okblk)
+    if out: print()
+    return out,gtypestr
+
+
+
+#############################
+##
+##  decoded state display
+##
+#############################
+
+def stat_getsorted(): # TODO, do it way more elegant
+  keys=list(rds_stat.keys())
+  return natsort(keys)
+#  for x in range(0,len(keys)):
+#    if len(keys[x])<3: keys[x]='-'+keys[x] # crude hack for natural sort
+ # keys=sorted(keys)
+  #for x in range(0,len(keys)):
+#    if keys[x][0]=='-': keys[x]=keys[x][1:]
+#  return keys
+
+grp0A_D_names=[ {'0':'PTYstatic','1':'PTYdynamic'},{'0':'notCompressed','1':'compressed'},{'0':'noArtHead','1':'artificialHead'},{'0':'mono','1':'stereo'} ]
+
+def printmemstat():
+    def showstat(x,frac):
+        p('  ['+x+' '+str(rds_stat[x]))
+        p('x '+str(round(100*frac,1))+'%]')
+
+    # RDS memory strings
+    for x in rds_mem:
+      p('  '+(x+' '*7)[:7])
+      rds_printmem(x)
+      if x=='DI':
+        p(' ')
+        s=rds_mem[x]
+        #p(names)
+        for x in range(0,4):
+          n=chr(s[x])
+          if n in grp0A_D_names[x]:
+            p('  '+grp0A_D_names[x][n])
+      print()
+
+    if rds_pic>=0:
+      p(f'  PIC:   {rds_pic:04x}')
+      ctry=getbits(rds_pic,12,4)
+      area=getbits(rds_pic,8,4)
+      p(f'  country={ctry} area={area}({RDS_PI_AREADESC[area]}) program={rds_pic&0xff}')
+      print()
+    if rds_pic>=0:
+      p(f'  PTY:   {rds_pty}')
+      p(' = '+RDS_RBDS_PTY_TYPES[rds_pty][RDS_RBDS])
+      print()
+
+    # groups statistics
+    tot=sum(rds_stat.values())
+    tot2=tot
+    if '--' in rds_stat: tot2-=rds_stat['--']
+    isbad=False
+    threshold=0.02 # 2%
+    p('  stat:')
+    if tot>0:
+      for x in stat_getsorted():
+        if x=='--': frac=rds_stat[x]/tot
+        else:       frac=rds_stat[x]/tot2
+        if x=='--' or x=='4A' or frac>=threshold: showstat(x,frac)
+        else: isbad=True
+      if isbad:
+        print()
+        p('  stat:  suspected bad:')
+        for x in stat_getsorted():
+          if x=='--' or x=='4A': continue
+          frac=rds_stat[x]/tot2
+          if frac < threshold: showstat(x,frac)
+    print()
+
+    # ODA group assign stats
+    tot=sum(rds_odagrpscnt.values())
+    thresh=0.05
+    isbad=False
+    p('  ODA: ')
+    if tot>0:
+      for x in rds_odagrps:
+        if rds_odagrpscnt[x]/tot>=thresh:
+          p('  ['+x+' '+rds_getodagrpname(x,threshold=0))
+          p(' '+str(rds_odagrpscnt[x]))
+          p('x]')
+        else: isbad=True
+      if 'ODA' in rds_tentative: p('  (tentative)')
+    if isbad:
+      print()
+      p('  ODA:   suspected bad:')
+      for x in rds_odagrps:
+        if rds_odagrpscnt[x]/tot<thresh:
+          p('  ['+x+' '+rds_getodagrpname(x,threshold=0))
+          p(' '+str(rds_odagrpscnt[x]))
+          p('x]')
+      #p('    [');p(rds_odagrps);p('] ');p(rds_odagrpscnt) # debug
+    print()
+
+    for l in rds_af_lists(None):
+      print(f'altfreq: {l.pi:04x}@'+rds_af_str(l))
+
+    if len(rds_tmclist)>0:
+      print('TMCseen:',len(rds_tmclist))
+
+    if rds_rtplus['item']!={}:
+      print('RT+item:',rds_rtplus_str())
+
+    rds_eon_show()
+
+    if rds_clock!=None:
+      c=rds_clock
+      p(f'clocksync: groups={c["n"]} hostclock={-c["wall"]:+.1f}s')
+      if c['drift']!=0: p(f' drift={1e6*c["drift"]:+.1f}ppm')
+      if RDS_CLOCK_DISCIPLINE: p(' (disciplining timestamps)')
+      print()
+
+
+# get RDS group statistics as single line
+def getrdsgrpstat():
+    s=''
+    for x in stat_getsorted():
+      if s!='': s+=' '
+      s+=x+':'+str(rds_stat[x])
+    return s
+
+
+
+
+#########################################
+##
+##  noninteractive parse of RDS-Spy dumps
+##
+#########################################
+
+# binary capture, see _rdsbin.py; f is a stream of it
+# tfrom/tto limit to a time range as on the commandline, records are found by bisection, no index needed
+def parse_rdsb(f,out=True,tfrom='',tto=''):
+    from _rdsbin import rdsb_reader, rdsb_unpackcorr, rdsb_find
+    r=rdsb_reader(f)
+    first=0;lastms=-1
+    if tfrom!='' or tto!='':
+      from datetime import datetime, timezone
+      from _rdsindex import spy_timekey, spy_time
+      date=f'{datetime.fromtimestamp(r.start,timezone.utc):%Y/%m/%d}'
+      rangems=lambda k: int((spy_time(k)+float(k[19:])-r.start)*1000)
+      if tfrom!='': first=rdsb_find(r,rangems(spy_timekey(tfrom,date)))
+      if tto!='': lastms=rangems(spy_timekey(tto,date))
+    for t,a,b,c,d,corr,rssi,chan in r.records(first):
+      if lastms>=0 and t>lastms: break
+      if corr==0xff: continue # all blocks uncorrectable
+      corr=rdsb_unpackcorr(corr)
+      handlerds(chan,None,raw=[a,b,c,d],rawcorr=corr,out=out)
+    r.close()
+
+# rds-spy text log from text stream f
+# tfrom/tto: time range, '2023/11/27 07:00' or '07:00' on the date of the log;
+# with the index sidecar of the log (dump --index, index command) reading starts near tfrom instead of at the start
+def parse_spy(f,out=True,tfrom='',tto='',index=''):
+    head=[]
+    fromkey=tokey=''
+    if tfrom!='' or tto!='':
+      from _rdsindex import spy_linetime, spy_timekey, spy_time, index_seek
+      ts=''
+      while ts=='': # date of the log from its first timestamp
+        s=f.readline()
+        if s=='': break
+        head.append(s)
+        ts=spy_linetime(s)
+      if tfrom!='': fromkey=spy_timekey(tfrom,ts[:10])
+      if tto!='': tokey=spy_timekey(tto,ts[:10])
+      if fromkey!='' and index!='' and f.seekable():
+        offset=index_seek(index,spy_time(fromkey))
+        if offset>0: f.seek(offset);head=[]
+    while True:
+      try:
+        s=head.pop(0) if head!=[] else f.readline()
+      except KeyboardInterrupt:
+        break
+      except: continue
+      if s=='': break
+      if fromkey!='' or tokey!='':
+        ts=spy_linetime(s)
+        if ts<fromkey: continue
+        if tokey!='' and ts>tokey: break
+      a=s.strip().split(' ')
+      i=[0]*4
+      c=[0]*4
+      if len(a)<4: continue
+      fail=False
+      for x in range(0,4):
+        if len(a[x])!=4: fail=True;break
+        if a[x]=='----': c[x]=3;continue # uncorrectable block, the rest of the group may still be good
+        try: i[x]=int(a[x],16)
+        except: fail=True;break
+      if fail or c==[3,3,3,3]: continue
+      #print(':',a,i)
+      handlerds(0,None,raw=i,rawcorr=c,out=out)
+
+# one input, binary capture or rds-spy log; b is a buffered binary stream, t its text stream if there is one (stdin)
+def parse_input(b,t=None,out=True,tfrom='',tto='',index=''):
+    from _rdsbin import rdsb_detect
+    if rdsb_detect(b): parse_rdsb(b,out=out,tfrom=tfrom,tto=tto);return
+    if t==None:
+      from io import TextIOWrapper
+      t=TextIOWrapper(b,errors='replace')
+    parse_spy(t,out=out,tfrom=tfrom,tto=tto,index=index)
+
+def parse_summary(out=True,stat=True,tmc=True):
+    if tmc:
+      if len(rds_tmclist)>0:
+        if out: print()
+        rds_tmclist_show()
+    if stat:
+      if out or tmc: print()
+      printmemstat()
+
+# files: parse these instead of stdin ('-' for stdin), plain or gzip/xz/bz2 compressed, see _rdsinput.py;
+# decoder state is reset for each file, with summary after each, or with carry kept across them (e.g. rotated segments);
+# summary(out,stat,tmc) replaces the text summary; returns the number of files that failed
+def main_stdin(out=True,stat=True,tmc=True,tfrom='',tto='',index='',files=[],carry=False,summary=None):
+    summary=summary or parse_summary
+    rds_initstr()
+    if files==[]:
+      parse_input(stdin.buffer,stdin,out=out,tfrom=tfrom,tto=tto,index=index)
+      summary(out,stat,tmc)
+      return 0
+    from _rdsinput import input_open
+    fails=0
+    if len(files)>1: index='' # index is of one log
+    for n,path in enumerate(files):
+      if n>0 and not carry: rds_initstr()
+      if len(files)>1 and not carry and (out or stat or tmc): print(('\n' if n>0 else '')+f'==> {path} <==')
+      if path=='-': parse_input(stdin.buffer,stdin,out=out,tfrom=tfrom,tto=tto,index=index)
+      else:
+        try: f=input_open(path)
+        except OSError as e: print('ERROR:',e);fails+=1;continue
+        try: parse_input(f,out=out,tfrom=tfrom,tto=tto,index=index)
+        except ValueError as e: print('ERROR:',path+':',e);fails+=1 # damaged binary capture
+        if getattr(f,'err',None)!=None: print('ERROR:',path+':',f.err);fails+=1 # decompression, see _rdsinput.py
+        f.close()
+      if not carry: summary(out,stat,tmc)
+    if carry: summary(out,stat,tmc)
+    return fails
+
+
+
+
+# rds-spy line formatting: block hex from a byte table, date prefix formatted once per second
+RDS_HEX=[f'{i:02X}' for i in range(256)]
+RDS_DEC=[f'{i:02}' for i in range(100)]
+rds_dumpsec=-1
+rds_dumpprefix=''
+
+def rds_spyline(rds,corr,t,corrthreshold=3):
+    global rds_dumpsec,rds_dumpprefix
+    sec=int(t)
+    if sec!=rds_dumpsec:
+      from time import gmtime, strftime
+      rds_dumpsec=sec
+      rds_dumpprefix=strftime(' @%Y/%m/%d %H:%M:%S.',gmtime(sec))
+    h=RDS_HEX
+    w=[h[x>>8]+h[x&255] for x in rds]
+    if max(corr)>corrthreshold: w=[w[i] if corr[i]<=corrthreshold else '----' for i in range(4)]
+    return ' '.join(w)+rds_dumpprefix+RDS_DEC[int((t-sec)*100)]+'\n'
+
+# read RDS registers and correction flags, output timestamped hex line to out (stdout by default), one write per line
+# returns (time, line length in bytes) of the line written, for the time index; None if nothing written
+def handlerds_dump(radio,corrthreshold=3,out=None):
+    rds,corr,dup=rds_read(radio)
+    if dup: return None # skip re-reads
+    rds_clock_syncraw(rds,corr)
+    if min(corr)>corrthreshold: return None # skip all-bad groups
+
+    t=rds_clock_now()
+    s=rds_spyline(rds,corr,t,corrthreshold)
+    (out or stdout).write(s)
+    return t,len(s)
+
+
+# RDS logs: https://github.com/walczakp/rds-spy-logs
+# RDS SPY: http://rdsspy.com/download/mainapp/rdsspy.pdf
+# example format:
+"""
+FE37 2415 2020 2020 @2018/01/02 19:20:13.56
+FE37 0409 E273 5449 @2018/01/02 19:20:13.65
+FE37 3410 0746 CD46 @2018/01/02 19:20:14.24
+"""
+
+
+
+# read RDS registers and correction flags, return (ok,group,corrections)
+def handlerds_get_raw(radio,corrthreshold=3):
+    rds,corr,dup=rds_read(radio)
+    if dup: return False,[],corr # skip re-reads
+    rds_clock_syncraw(rds,corr)
+
+    for t in range(0,4):
+      if corr[t]>corrthreshold: return False,[],corr # skip bad packets
+
+    return True,rds,corr
+
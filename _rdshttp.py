@@ -0,0 +1,182 @@
+
+# status server for interactive mode (--http [host:]port), asyncio on its own thread
+#   GET /          short text status
+#   GET /status    JSON snapshot: decoded state as printmemstat() shows it, TMC list, chip registers
+#   GET /events    WebSocket, NDJSON events of the decoder (see _rdsjson.py), one per text frame
+# the acquisition loop builds the snapshot (at most every HTTP_REFRESH seconds, only if something changed)
+# and swaps in the new encoded copy; requests only read that copy, so clients never cause chip traffic
+
+import asyncio
+from threading import Thread
+from time import monotonic, time
+from json import dumps
+from sys import stderr
+
+from _rdsconfig import RDS_RBDS
+from _rdslists import RDS_RBDS_PTY_TYPES
+from _rdsutil import fmtfreq
+import _rdsdecoder as dec
+
+HTTP_REFRESH=0.5     # seconds between snapshots
+HTTP_WSQUEUE=256     # events queued per WebSocket client; a client that falls behind is disconnected
+HTTP_WSGUID=b'258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+
+
+# decoded state as plain data
+def http_state(channel,radio):
+    tot=sum(dec.rds_odagrpscnt.values())
+    events=dec.rds_tmc_events() if dec.rds_tmclist else {}
+    now=monotonic()
+    tmc=[]
+    for key in sorted(dec.rds_tmclist):
+      e,loc,direc=key.split(':')
+      t=dec.rds_tmclist[key]
+      tmc.append({'event':int(e,16),'loc':loc.upper(),'dir':int(direc),'desc':events.get(int(e,16),''),
+                  'count':t['cnt'],'age':round(now-t['when'])})
+    return {'time':round(time(),2),
+            'freq':fmtfreq(channel,pad=' ').strip(),'chan':channel,'rssi':radio.si4703getRssi(),
+            'regs':[f'{x:04x}' for x in radio.si4703_registers],
+            'pi':f'{dec.rds_pic:04X}' if dec.rds_pic>=0 else '',
+            'pty':dec.rds_pty,'ptyname':RDS_RBDS_PTY_TYPES[dec.rds_pty][RDS_RBDS] if dec.rds_pty>=0 else '',
+            'mem':{x:dec.rds_getmem(x,quot='') for x in dec.rds_mem},
+            'tentative':sorted(dec.rds_tentative),
+            'stat':{x:dec.rds_stat[x] for x in dec.stat_getsorted()},
+            'oda':{g:{'aid':f'{dec.rds_odagrps[g]:04X}','name':dec.rds_getodagrpname(g,threshold=0),'count':dec.rds_odagrpscnt.get(g,0),
+                      'share':round(dec.rds_odagrpscnt.get(g,0)/tot,3) if tot else 0} for g in dec.rds_odagrps},
+            'af':[f'{l.pi:04x}@'+dec.rds_af_str(l) for l in dec.rds_af_lists(None)],
+            'rtplus':dict(dec.rds_rtplus['item']),
+            'eon':[{'pi':f'{e.pi:04X}','ps':e.ps.decode('utf-8','replace'),'pty':e.pty,'ta':e.ta,'count':e.cnt}
+                   for e in sorted(dec.rds_eon.values(),key=lambda e:e.pi)],
+            'tmc':tmc}
+
+
+# binary stream interface for the json writer: complete lines go to the WebSocket clients
+class http_eventout(object):
+    def __init__(self,srv):
+        self.srv=srv
+    def write(self,b):
+        if self.srv.clients: self.srv.loop.call_soon_threadsafe(self.srv.broadcast,b.decode().splitlines())
+    def flush(self): pass
+
+
+class http_server(object):
+    def __init__(self,host='',port=8080):
+        self.host=host
+        self.port=port
+        self.snap=b'{}'    # encoded snapshot, replaced as a whole, never modified
+        self.text=b''
+        self.tnext=0
+        self.lastkey=None
+        self.clients=set() # queues of WebSocket clients
+        self.loop=asyncio.new_event_loop()
+        Thread(target=self.run,daemon=True).start()
+        from _rdsjson import json_start
+        self.events=json_start(http_eventout(self),clock=dec.rds_clock_now)
+
+    def run(self):
+        asyncio.set_event_loop(self.loop)
+        try: self.loop.run_until_complete(asyncio.start_server(self.handle,self.host or None,self.port))
+        except OSError as e: print('http:',e,file=stderr);return
+        self.loop.run_forever()
+
+    # from the acquisition loop, every iteration
+    def update(self,channel,radio):
+        t=monotonic()
+        if t<self.tnext: return
+        self.tnext=t+HTTP_REFRESH
+        key=(channel,sum(dec.rds_stat.values()),radio.si4703getRssi())
+        if key==self.lastkey: return # nothing new received
+        self.lastkey=key
+        s=http_state(channel,radio)
+        self.snap=dumps(s,separators=(',',':')).encode()
+        self.text=(f'{s["freq"]} MHz rssi={s["rssi"]} PI={s["pi"]} PS="{s["mem"].get("0A","")}" PTY={s["ptyname"]}\n'
+                   f'RT: {s["mem"].get("2","")}\ngroups: {dec.getrdsgrpstat()}\n').encode()
+        self.events.flush()
+
+    def command(self):
+        return ''
+
+    def close(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+    def broadcast(self,lines):
+        for q in list(self.clients):
+          for l in lines:
+            try: q.put_nowait(l)
+            except asyncio.QueueFull: # fell behind, let it go
+              self.clients.discard(q)
+              q.get_nowait();q.put_nowait(None)
+              break
+
+    async def handle(self,reader,writer):
+        try:
+          req=await reader.readline()
+          hdrs={}
+          while True:
+            l=await reader.readline()
+            if l in (b'\r\n',b'\n',b''): break
+            k,_,v=l.decode('latin-1').partition(':')
+            hdrs[k.strip().lower()]=v.strip()
+          parts=req.decode('latin-1').split()
+          path=parts[1].split('?')[0] if len(parts)>1 else '/'
+          if path=='/events' and 'sec-websocket-key' in hdrs: await self.websocket(reader,writer,hdrs['sec-websocket-key'])
+          elif path=='/status': await self.respond(writer,b'200 OK','application/json',self.snap)
+          elif path=='/': await self.respond(writer,b'200 OK','text/plain; charset=utf-8',self.text)
+          else: await self.respond(writer,b'404 Not Found','text/plain',b'not found\n')
+        except (ConnectionError,asyncio.IncompleteReadError): pass
+        finally: writer.close()
+
+    async def respond(self,writer,status,ctype,body):
+        writer.write(b'HTTP/1.1 '+status+b'\r\nContent-Type: '+ctype.encode()+b'\r\nContent-Length: '+str(len(body)).encode()+
+                     b'\r\nCache-Control: no-cache\r\nAccess-Control-Allow-Origin: *\r\nConnection: close\r\n\r\n'+body)
+        await writer.drain()
+
+    async def websocket(self,reader,writer,key):
+        from hashlib import sha1
+        from base64 import b64encode
+        accept=b64encode(sha1(key.encode()+HTTP_WSGUID).digest())
+        writer.write(b'HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\nSec-WebSocket-Accept: '+accept+b'\r\n\r\n')
+        await writer.drain()
+        q=asyncio.Queue(HTTP_WSQUEUE)
+        self.clients.add(q)
+        rd=asyncio.ensure_future(self.wsread(reader,writer))
+        try:
+          while not rd.done():
+            get=asyncio.ensure_future(q.get())
+            await asyncio.wait((get,rd),return_when=asyncio.FIRST_COMPLETED)
+            if not get.done(): get.cancel();break
+            l=get.result()
+            if l==None: break # fell behind
+            writer.write(ws_frame(0x1,l.encode()))
+            await writer.drain()
+        finally:
+          self.clients.discard(q)
+          if rd.done() and not rd.cancelled(): rd.exception() # disconnect, retrieved to keep asyncio quiet
+          rd.cancel()
+
+    # client frames: answer pings, end on close; the client sends nothing else of interest
+    async def wsread(self,reader,writer):
+        while True:
+          h=await reader.readexactly(2)
+          n=h[1]&0x7f
+          if n==126: n=int.from_bytes(await reader.readexactly(2),'big')
+          elif n==127: n=int.from_bytes(await reader.readexactly(8),'big')
+          mask=await reader.readexactly(4) if h[1]&0x80 else bytes(4)
+          data=bytes(b^mask[i&3] for i,b in enumerate(await reader.readexactly(n)))
+          op=h[0]&0x0f
+          if op==0x8: writer.write(ws_frame(0x8,data[:2]));return
+          if op==0x9: writer.write(ws_frame(0xa,data))
+
+
+def ws_frame(op,data):
+    n=len(data)
+    if n<126: h=bytes((0x80|op,n))
+    elif n<65536: h=bytes((0x80|op,126))+n.to_bytes(2,'big')
+    else: h=bytes((0x80|op,127))+n.to_bytes(8,'big')
+    return h+data
+
+
+# server for '--http' argument: port or host:port
+def http_start(spec='8080'):
+    host,_,port=spec.rpartition(':')
+    return http_server(host,int(port))
@@ -0,0 +1,79 @@
+
+# sparse time index for rds-spy logs: sidecar file of (unix time, byte offset) entries every RDS_INDEX_STEP seconds,
+# written by the dumper as it goes (dump --index) or built for an existing log (index command);
+# parse --from/--to seeks to the last entry before the range instead of reading the log from the start
+
+from struct import Struct
+
+RDS_INDEX_STEP=10        # seconds between entries
+RDS_INDEX_ENTRY=Struct('<qQ') # unix seconds, byte offset of the first line of that second
+
+
+# log timestamp '2023/11/27 18:00:06.95' to unix seconds, the log is in UTC
+def spy_time(ts):
+    from calendar import timegm
+    return timegm((int(ts[0:4]),int(ts[5:7]),int(ts[8:10]),int(ts[11:13]),int(ts[14:16]),int(ts[17:19]),0,0,0))
+
+# timestamp of log line, '' if none
+def spy_linetime(s):
+    i=s.find('@')
+    if i<0: return ''
+    return s[i+1:i+23]
+
+# time from commandline to log timestamp text, comparable as string;
+# '2023/11/27 07:00', '2023-11-27T07:00:30', or '07:00' on the date given
+def spy_timekey(s,date=''):
+    s=s.strip().replace('-','/').replace('T',' ')
+    if ' ' in s: date,s=s.split(' ',1)
+    h,m,sec=(s.split(':')+['0','0'])[:3]
+    return f'{date} {int(h):02}:{int(m):02}:{float(sec):05.2f}'
+
+
+# incremental writer; add() every line with its offset, an entry is written when the step changes
+class index_writer(object):
+    def __init__(self,path):
+        self.f=open(path,'wb')
+        self.last=-1
+
+    def add(self,t,offset):
+        step=int(t)//RDS_INDEX_STEP
+        if step==self.last: return
+        self.last=step
+        self.f.write(RDS_INDEX_ENTRY.pack(int(t),offset))
+        self.f.flush()
+
+    def close(self):
+        self.f.close()
+
+
+# build index for an existing log
+def index_build(logpath,idxpath):
+    w=index_writer(idxpath)
+    offset=0
+    lastsec=''
+    n=0
+    with open(logpath,'rb') as f:
+      for line in f:
+        ts=spy_linetime(line.decode('ascii','replace'))
+        if ts!='' and ts[:19]!=lastsec: # parse time once per second
+          lastsec=ts[:19]
+          try: w.add(spy_time(ts),offset);n+=1
+          except ValueError: pass
+        offset+=len(line)
+    w.close()
+    return n
+
+# byte offset to start reading for time t (unix seconds); 0 if before the index
+def index_seek(idxpath,t):
+    from bisect import bisect_right
+    with open(idxpath,'rb') as f: data=f.read()
+    entries=list(RDS_INDEX_ENTRY.iter_unpack(data[:len(data)//RDS_INDEX_ENTRY.size*RDS_INDEX_ENTRY.size]))
+    i=bisect_right([e[0] for e in entries],t)
+    if i==0: return 0
+    return entries[i-1][1]
+
+
+# index command
+def main_index(logpath):
+    n=index_build(logpath,logpath+'.idx')
+    print(f'{logpath}.idx: {n} seconds indexed, entry every {RDS_INDEX_STEP} s')
@@ -0,0 +1,57 @@
+
+# parse input files: plain, or gzip/xz/bz2 compressed, detected by magic bytes
+# compressed files are decompressed in large chunks on a thread writing into a pipe, so decompression
+# (which releases the GIL in the codecs) overlaps decoding, with no external zcat process
+
+from threading import Thread
+from os import pipe, fdopen
+from io import BufferedReader, FileIO
+
+INPUT_CHUNK=1<<20  # decompressed bytes per read
+INPUT_MAGIC=((b'\x1f\x8b','gzip'),(b'\xfd7zXZ\x00','xz'),(b'BZh','bz2'))
+
+
+def input_compression(f):
+    head=f.peek(6)[:6]
+    for m,name in INPUT_MAGIC:
+      if head.startswith(m): return name
+    return ''
+
+# read end of the pipe; err is the decompression error of the thread, set before the pipe is closed,
+# so it is there when the reader sees the end
+class input_stream(BufferedReader):
+    err=None
+
+# thread body: decompress src (of raw file f) into the pipe
+def input_pump(src,f,w,stream):
+    try:
+      while True:
+        b=src.read(INPUT_CHUNK)
+        if not b: break
+        w.write(b)
+    except BrokenPipeError: pass # reader gone
+    except Exception as e: stream.err=e # damaged or truncated file
+    finally:
+      src.close()
+      f.close()
+      try: w.close()
+      except BrokenPipeError: pass
+
+# open file for parse as buffered binary stream; plain files stay seekable (mapped reading, index seeking)
+def input_open(path):
+    f=open(path,'rb')
+    comp=input_compression(f)
+    if comp=='': return f
+    if comp=='gzip':
+      import gzip
+      src=gzip.GzipFile(fileobj=f)
+    elif comp=='xz':
+      import lzma
+      src=lzma.LZMAFile(f)
+    else:
+      import bz2
+      src=bz2.BZ2File(f)
+    r,w=pipe()
+    stream=input_stream(FileIO(r,'r'))
+    Thread(target=input_pump,args=(src,f,fdopen(w,'wb'),stream),daemon=True).start()
+    return stream
@@ -0,0 +1,343 @@
+
+# interactive mode: keypress-controlled receiver with scrolling RDS groups and a status line
+
+from time import sleep, monotonic
+from sys import stdin
+from shutil import get_terminal_size
+
+from _rdsconfig import ONCRASH_OFF, RDS_FILTERS, STATUS_REFRESH
+from _rdsutil import p, getchanrssi, timing_mark
+from _rdsradio import getradio, printreg, printvol, radio_verb, RADIO_VERBS
+from _rdsdecoder import rds_initstr, rds_retune, rds_getmem, rds_get_quickgroups, getrdsgrpstat, printmemstat, rds_tmclist_show, handlerds
+from _rdsmodes import stations_scan
+from _rdsstations import db_station_save, db_preset_step, db_presets
+import _rdsdecoder as dec
+
+
+###############################################
+##
+##  nonblocking stdin read for keypress control
+##
+###############################################
+
+## https://ballingt.com/nonblocking-stdin-in-python-3/
+from fcntl import fcntl,F_GETFL,F_SETFL
+from os import O_NONBLOCK
+from tty import setcbreak
+from termios import tcgetattr,tcsetattr,TCSANOW
+
+class raw(object):
+    def __init__(self, stream):
+        self.stream = stream
+        self.fd = self.stream.fileno()
+    def __enter__(self):
+        self.original_stty = tcgetattr(self.stream)
+        setcbreak(self.stream)
+    def __exit__(self, type, value, traceback):
+        tcsetattr(self.stream, TCSANOW, self.original_stty)
+
+class nonblocking(object):
+    def __init__(self, stream):
+        self.stream = stream
+        self.fd = self.stream.fileno()
+    def __enter__(self):
+        self.orig_fl = fcntl(self.fd, F_GETFL)
+        fcntl(self.fd, F_SETFL, self.orig_fl | O_NONBLOCK)
+    def __exit__(self, *args):
+        fcntl(self.fd, F_SETFL, self.orig_fl)
+
+
+
+###############################
+##
+##  status line renderer
+##
+###############################
+
+STATUS_GAP=4 # unchanged cells between changed ones rewritten rather than skipped with a cursor move
+
+# status line repainted only when its inputs change, at most refresh times per second;
+# only the cells that differ from what is on the terminal are rewritten
+class statusline(object):
+    def __init__(self,cols,refresh=STATUS_REFRESH):
+        self.cols=cols
+        self.interval=1/refresh if refresh>0 else 0
+        self.key=None
+        self.shown=''  # text on the terminal line, '' after it was overwritten by other output
+        self.tnext=0
+
+    # the line was erased or scrolled away by other output
+    def invalidate(self):
+        self.key=None
+        self.shown=''
+
+    # key: tuple of everything the line shows, build: function making the line
+    def update(self,key,build):
+        if key==self.key: return
+        t=monotonic()
+        if t<self.tnext: return # key not taken, painted on a later iteration
+        self.key=key
+        self.tnext=t+self.interval
+        self.draw(build()[:self.cols-2])
+
+    # cursor is at the start of the line before and after
+    def draw(self,s):
+        old=self.shown
+        if s==old: return
+        n=max(len(s),len(old))
+        new=s.ljust(n)
+        old=old.ljust(n)
+        d=[i for i in range(n) if new[i]!=old[i]]
+        out=[]
+        col=k=0
+        while k<len(d):
+          i=d[k];j=i+1;k+=1
+          while k<len(d) and d[k]-j<STATUS_GAP: j=d[k]+1;k+=1
+          if i>col: out.append(f'\x1b[{i-col}C')
+          out.append(new[i:j])
+          col=j
+        p(''.join(out)+'\r')
+        self.shown=s
+
+
+# interactive help
+def help_interactive():
+  print()
+  print("""
+Keyboard keypress controls:
+===========================
+
+<space> pause/resume output
+  - +   volume
+  [ ]   prev/next station
+  < >   prev/next known station from the station database
+  ?     help
+  f     filter RDS, hide 0A and 2A "spam"
+  h     hide/show fixed header
+
+  g     toggle 2A radiotext string vs group stats
+  s     show RDS string buffers
+  t     show RDS-TMC traffic data log
+
+  S     stations scan
+
+  i     reset/initialize chip
+  I     powerdown chip
+  r     show chip registers
+
+  q     quit, switch off radio
+  Q     quit, keep radio running
+
+status line format:
+freq RSSI "station" state current-group seen-groups "radiotext"/stats [<paused/filtered>]
+state can be P for paused, F for filtering, R flashing when group was received
+""")
+
+  print()
+  print('Filters:',RDS_FILTERS)
+  print()
+
+# main interactive loop
+# remotes: state publishers (MQTT, HTTP status, see _rdsmqtt.py, _rdshttp.py), update() every loop, their commands act as keypresses
+def main(init=False,deinit=ONCRASH_OFF,remotes=[]):
+    # device ID is typically 0x10 - confirm with "sudo i2cdetect 1"
+    # I2C_addr, GPIO_RESET, GPIO_INT(GPIO2)
+    try: COLS=get_terminal_size().columns
+    except: COLS=80
+
+    rds_initstr()
+    radio = getradio()
+    printreg(radio)
+    channel=0
+
+    if init or not radio.si4703isInitialized():
+      radio.si4703Init()
+    else: radio.si4703InitPwr()
+    timing_mark('chip init')
+
+    radio.print_version()
+    printvol(radio)
+
+    #print('COLS:',COLS)
+    eraseline=' '*(COLS-2)+'\r'
+
+    radio_off=deinit  # do not silence when crashing
+    showrds=True      # show every RDS packet in scrolling view
+    showgrpstat=False # show group stats instead of long 2A string
+    rdsskipgrp=[]     # filter of groups to not show
+    rdsonlygrp=[]     # filter of groups to only show
+    filteridx=0       # selected filter index
+    outfixed=False    # output the fixed group from rds[0,1]
+
+    nogrp=0           # counter of no-RDS-data, to hide last group
+    lastgrp=''        # last group received, ephemeral, shown on status line
+
+    channel=radio.si4703GetChannel()
+    rds_retune(channel)
+    n=len(db_presets())
+    if n>0: print(n,'known stations, < > to tune')
+
+    status=statusline(COLS)
+    print('ready')
+    # do not block input, for immediate keypress handling
+    with raw(stdin):
+     with nonblocking(stdin):
+      try:
+       while True:
+        sleep(0.002)
+        radio.si4703ReadRegisters()
+
+        noshowrow=False
+        isrds=radio.isrds()
+        if isrds:
+          noshowrow,lastgrp=handlerds(channel,radio,skipgrp=rdsskipgrp,onlygrp=rdsonlygrp,out=showrds,outfixed=outfixed,eraseline=eraseline,lastgrp=lastgrp)
+          nogrp=0
+        else: nogrp+=1
+        if nogrp>50: lastgrp=''
+        if noshowrow: status.invalidate() # a group row was printed on the line
+        else:
+          def statustext():
+            s=getchanrssi(channel,radio)
+            s+=rds_getmem('0A')+' ' # show short station ID
+            if not showrds:      s+=['P','R'][isrds] # is paused
+            elif rdsskipgrp!=[]: s+=['F','R'][isrds] # is filtered
+            else: s+=' '                             # is running
+            s+=('    '+lastgrp)[-4:]
+            s+=' '+rds_get_quickgroups() # what groups were shown
+            s+='  '
+            if showgrpstat: s+='['+getrdsgrpstat()+']'
+            else: s+=rds_getmem('2') # show long station data
+            if not showrds: s+=' <paused>'
+            elif rdsskipgrp!=[]: s+=' <filtered:'+','.join(rdsskipgrp)+'>'
+            return s
+          # new groups read (not re-reads) stand for the decoded state
+          status.update((channel,radio.si4703getRssi(),isrds,showrds,filteridx,showgrpstat,lastgrp,dec.rds_cnt[0]-dec.rds_cnt[1]),statustext)
+
+        for r in remotes: r.update(channel,radio)
+
+        # read character, or remote command
+        cmd = stdin.read(1)
+        for r in remotes:
+          if cmd=='': cmd=r.command()
+        if cmd=='': continue
+
+        # erase current realtime-data line
+        #p(' '*30+'\r')
+        p(eraseline) # terminal screen width
+        status.invalidate()
+
+        # pause/resume
+        if cmd==' ':
+            showrds= not showrds
+        # console command help
+        elif cmd == "?":
+            showrds=False
+            help_interactive()
+
+        # tune seek down
+        elif cmd in ['[',']']:
+            db_station_save(channel,radio.si4703getRssi())
+            p('tuning\r')
+            if cmd=='[': radio.si4703SeekDown()
+            else: radio.si4703SeekUp()
+            lastgrp=''
+            channel=radio.si4703GetChannel()
+            rds_retune(channel)
+
+        # tune to known station
+        elif cmd in ['<','>',',','.']:
+            c=db_preset_step(channel,[1,-1][cmd in '<,'])
+            if c==0: print('no known stations, scan with S');continue
+            db_station_save(channel,radio.si4703getRssi())
+            p('tuning\r')
+            radio.si4703SetChannel(c)
+            lastgrp=''
+            channel=radio.si4703GetChannel()
+            rds_retune(channel)
+
+        # volume down
+        elif cmd == "-":
+            radio.si4703SetVolume(radio.si4703GetVolume()-1)
+            printvol(radio)
+        # volume up
+        elif cmd == "+" or cmd == "=":
+            radio.si4703SetVolume(radio.si4703GetVolume()+1)
+            printvol(radio)
+
+        # cycle or reset RDS filters
+        elif cmd=="f" or cmd=="F":
+            if cmd=='F': filteridx=0
+            else: filteridx=(filteridx+1)%len(RDS_FILTERS)
+            rdsskipgrp=RDS_FILTERS[filteridx]
+            if rdsskipgrp==[]: print('--- filter off')
+            else:              print('--- filter on:',rdsskipgrp)
+            rdsonlygrp=[]
+            #print(rdsskipgrp)
+            for x in rdsskipgrp:
+              if x[0]=='=': rdsonlygrp.append(x[1:])
+            #print('filter:','-',rdsskipgrp,'+',rdsonlygrp)
+
+        elif cmd=='g':
+            showgrpstat=not showgrpstat
+
+        elif cmd=='h':
+            outfixed=not outfixed
+
+        # show RDS memory strings
+        elif cmd == "s":
+            print()
+            printmemstat()
+            print()
+
+        elif cmd == "t":
+            print()
+            rds_tmclist_show()
+            print()
+
+        # dump chip registers
+        elif cmd == "r":
+            printreg(radio)
+            print()
+        # reset/initialize chip
+        elif cmd == "i":
+            radio.si4703Init()
+            lastgrp=''
+            channel=radio.si4703GetChannel()
+            rds_retune(channel)
+        # shutdown/poweroff chip
+        elif cmd == "I":
+            radio.si4703ShutDown()
+
+        elif cmd in RADIO_VERBS: # remote commands
+            radio_verb(radio,cmd)
+
+        elif cmd == "S":
+            stations_scan(radio)
+            channel=radio.si4703GetChannel()
+            rds_retune(channel)
+
+        # quit, shut down radio
+        elif cmd == "q":
+            db_station_save(channel,radio.si4703getRssi())
+            print()
+            printmemstat()
+            radio_off=True
+            break
+        # quit, keep radio running
+        elif cmd == "Q":
+            db_station_save(channel,radio.si4703getRssi())
+            print()
+            printmemstat()
+            radio_off=False
+            break
+
+      except KeyboardInterrupt:
+        radio_off=False
+        print("Exiting program")
+      finally:
+        print(' '*20)
+        if radio_off:
+          print("Shutting down radio")
+          radio.si4703ShutDown()
+        else: print("Exiting, keeping radio")
+        print()
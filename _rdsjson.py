@@ -0,0 +1,132 @@
+
+# NDJSON event output (--json): one object per line for decoded state changes, not the human text of p()
+#   {"ev":"ps","pi":"2337","ps":"COUNTRY "}   events: pi, ps, rt, clock, af, oda, tmc, group (raw), stat
+# state events are emitted only when the value changed; raw groups with --json-raw, always in dump --json
+# objects are put together from fixed text and the C string encoder, lines are written in batches
+
+from json.encoder import encode_basestring as jstr
+from time import monotonic
+
+import _rdsdecoder as dec
+
+JSON_FLUSH_COUNT=64  # lines buffered before write
+JSON_FLUSH_TIME=1.0  # max seconds a line stays buffered
+
+
+class json_writer(object):
+    def __init__(self,out,raw=False,clock=None):
+        self.out=out        # binary stream
+        self.raw=raw        # raw group events from the decoder hook
+        self.clock=clock    # time source for "t", None = no time (log replay)
+        self.buf=[]
+        self.tflush=monotonic()
+        self.pi=-1
+        self.last={}        # emitted values by (PI, kind), kept per PI so a noisy PI flip does not repeat everything
+        self.psmask={}      # PS segments received by PI since the name was last checked
+        self.tmcseen=set()  # TMC messages emitted, the decoder list is not per PI
+
+    # event with common fields; rest is the JSON text of the remaining members, with leading comma
+    def emit(self,ev,rest=''):
+        s='{"ev":"'+ev+'"'
+        if self.pi>=0: s+=f',"pi":"{self.pi:04X}"'
+        if self.clock!=None: s+=f',"t":{self.clock():.2f}'
+        self.buf.append(s+rest+'}\n')
+        if len(self.buf)>=JSON_FLUSH_COUNT: self.flush()
+
+    # emit if value of kind changed for current PI
+    def changed(self,kind,val):
+        k=(self.pi,kind)
+        if self.last.get(k)==val: return False
+        self.last[k]=val
+        return True
+
+    def flush(self):
+        if self.buf:
+          self.out.write(''.join(self.buf).encode())
+          self.buf=[]
+        self.out.flush()
+        self.tflush=monotonic()
+
+    def close(self):
+        self.flush()
+
+    def rawgroup(self,rds,corr,grp=''):
+        h=dec.RDS_HEX
+        b=' '.join(h[x>>8]+h[x&255] if c<3 else '----' for x,c in zip(rds,corr))
+        self.emit('group',(f',"grp":"{grp}"' if grp!='' else '')+f',"blocks":"{b}","corr":"{corr[0]}{corr[1]}{corr[2]}{corr[3]}"')
+
+    # decoder hook, after every accepted group
+    def state(self,gtypestr,rds,corr,okblk):
+        if dec.rds_pic!=self.pi:
+          self.pi=dec.rds_pic
+          self.emit('pi')
+        if self.raw: self.rawgroup(rds,corr,gtypestr)
+        if self.changed('pty',dec.rds_pty): self.emit('pty',f',"pty":{dec.rds_pty}')
+
+        if gtypestr in ('0A','0B'):
+          if okblk[3]:
+            m=self.psmask.get(self.pi,0)|1<<(rds[1]&3)
+            self.psmask[self.pi]=m
+            if m==15: # whole name received again
+              self.psmask[self.pi]=0
+              ps=dec.rds_mem['0A'].decode('utf-8','replace')
+              if self.changed('ps',ps): self.emit('ps',',"ps":'+jstr(ps))
+          if gtypestr=='0A':
+            for l in dec.rds_af_lists(self.pi):
+              ch=dec.rds_af_channels(l)
+              if self.changed(('af',l.chan),(l.method,ch)):
+                self.emit('af',f',"chan":{l.chan},"method":"{l.method or "?"}","af":[{",".join(str(c) for c in ch if c!=l.chan)}]')
+
+        elif gtypestr=='2A':
+          m=dec.rds_mem['2']
+          end=m.find(b'\r')
+          n=64 if end<0 else end+1 # text ends at CR or fills all 64 chars
+          if dec.rds_rt_complete(0,n):
+            rt=m[:n].decode('utf-8','replace').rstrip('\r ')
+            if self.changed('rt',rt): self.emit('rt',',"rt":'+jstr(rt))
+
+        elif gtypestr=='3A':
+          g=str((rds[1]>>1)&15)+'AB'[rds[1]&1]
+          aid=dec.rds_getodagrp(g)
+          if aid!='' and self.changed(('oda',g),aid):
+            h=dec.RDS_ODA.get(aid)
+            self.emit('oda',f',"group":"{g}","aid":"{aid:04X}","name":'+jstr(h.name if h!=None else dec.RDS_ODA_AID.get(aid,'')))
+
+        elif gtypestr=='4A':
+          clock=dec.rds_mem['clock']
+          if self.changed('clock',clock): self.emit('clock',',"utc":'+jstr(clock)+',"local":'+jstr(dec.rds_mem['lclock']))
+
+        if len(dec.rds_tmclist)<len(self.tmcseen): self.tmcseen&=dec.rds_tmclist.keys() # decoder reset
+        if len(dec.rds_tmclist)!=len(self.tmcseen):
+          events=dec.rds_tmc_events()
+          for key in dec.rds_tmclist:
+            if key in self.tmcseen: continue
+            self.tmcseen.add(key)
+            event,loc,direc=key.split(':')
+            event=int(event,16)
+            self.emit('tmc',f',"event":{event},"loc":"{loc.upper()}","dir":{direc},"desc":'+jstr(events.get(event,'')))
+
+        if monotonic()-self.tflush>=JSON_FLUSH_TIME: self.flush()
+
+    # dump --json: raw group, then decoded state; the writer interface of _rdspcap/_rdsbin
+    def write(self,rds,t,chan=0,rssi=-1,corr=None):
+        corr=corr or [0,0,0,0]
+        self.rawgroup(rds,corr)
+        dec.handlerds(chan,None,raw=rds,rawcorr=corr,out=False)
+        if monotonic()-self.tflush>=JSON_FLUSH_TIME: self.flush()
+
+    def stat(self):
+        self.emit('stat',',"grps":{'+','.join(f'"{g}":{dec.rds_stat[g]}' for g in dec.stat_getsorted())+'}')
+
+
+# install the writer as decoder hook, after any already installed
+def json_start(out,raw=False,clock=None):
+    w=json_writer(out,raw=raw,clock=clock)
+    prev=dec.rds_evhook
+    if prev==None: dec.rds_evhook=w.state
+    else:
+      def both(*a):
+        prev(*a)
+        w.state(*a)
+      dec.rds_evhook=both
+    return w
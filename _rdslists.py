@@ -210,7 +210,7 @@ RDSPLUS_TAGS=[
   'programme_part',  # 35,
   'programme_host',  # 36,
   'programme_editorial_staff',  # 37,
-  'programme_frequency=',  # 
+  'programme_frequency',  # 38,
   'programme_homepage',  # 39,
   'programme_subchannel',  # 40,
   'phone_hotline',  # 41,
@@ -226,6 +226,11 @@ RDSPLUS_TAGS=[
   'chat_center',  # 51,
   'vote_question',  # 52,
   'vote_center',  # 53,
+  'rfu_54',  # 54, reserved
+  'rfu_55',  # 55, reserved
+  'rfu_56',  # 56, reserved
+  'rfu_57',  # 57, reserved
+  'rfu_58',  # 58, reserved
   'place',  # 59,
   'appointment',  # 60,
   'identifier',  # 61,
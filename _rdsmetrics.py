@@ -0,0 +1,109 @@
+
+# Prometheus metrics (--metrics [host:]port): GET /metrics in the text exposition format
+#   groups by type, bad groups, correction levels by block, duplicate reads, estimated lost groups (from _rdsdecoder),
+#   I2C transactions and errors, seek/tune latency (from the chip object), RSSI, stereo, poll loop iteration time
+# the acquisition loop only bumps list slots and remembers the radio; the text is put together on the server
+# thread when scraped, from the registers as last read, so a scrape never causes chip traffic
+
+from threading import Thread
+from time import monotonic
+from bisect import bisect_left
+from sys import stderr
+
+import _rdsdecoder as dec
+
+METRICS_LOOP_BUCKETS=(0.001,0.002,0.005,0.01,0.02,0.05,0.1,0.5,1.0) # seconds, poll loop iteration histogram
+METRICS_BLOCKS='ABCD'
+
+
+# text exposition of one metric: [(labels,value)]
+def metrics_lines(name,mtype,help,samples):
+    r=[f'# HELP {name} {help}\n# TYPE {name} {mtype}\n']
+    for labels,v in samples: r.append(f'{name}{{{labels}}} {v}\n' if labels else f'{name} {v}\n')
+    return r
+
+
+class metrics_server(object):
+    def __init__(self,host='',port=9703):
+        self.radio=None
+        self.channel=0
+        self.loopbkt=[0]*(len(METRICS_LOOP_BUCKETS)+1) # not cumulative, last is +Inf
+        self.loopsum=0.0
+        self.tlast=0
+        from http.server import HTTPServer, BaseHTTPRequestHandler
+        srv=self
+        class handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0]!='/metrics':
+                  self.send_error(404);return
+                body=srv.render().encode()
+                self.send_response(200)
+                self.send_header('Content-Type','text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length',str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            def log_message(self,*args): pass
+        try: self.httpd=HTTPServer((host,port),handler)
+        except OSError as e: print('metrics:',e,file=stderr);self.httpd=None;return
+        Thread(target=self.httpd.serve_forever,daemon=True).start()
+
+    # from the acquisition loop, every iteration
+    def update(self,channel,radio):
+        t=monotonic()
+        if self.tlast:
+          dt=t-self.tlast
+          self.loopbkt[bisect_left(METRICS_LOOP_BUCKETS,dt)]+=1
+          self.loopsum+=dt
+        self.tlast=t
+        self.channel=channel
+        self.radio=radio
+
+    def command(self):
+        return ''
+
+    def close(self):
+        if self.httpd!=None: self.httpd.shutdown()
+
+    def render(self):
+        c=dec.rds_cnt
+        g=dec.rds_grpcnt
+        h=dec.rds_corrhist
+        r=metrics_lines('si4703_groups_total','counter','RDS groups received, by group type',
+                        [(f'type="{i>>1}{"AB"[i&1]}"',g[i]) for i in range(32) if g[i]])
+        r+=metrics_lines('si4703_bad_groups_total','counter','RDS groups with block B uncorrectable or suspicious',[('',c[2])])
+        r+=metrics_lines('si4703_block_corrections_total','counter','RDS blocks by correction level: 0 none, 1 1-2 bits, 2 3-5 bits, 3 uncorrectable',
+                         [(f'block="{METRICS_BLOCKS[i>>2]}",level="{i&3}"',h[i]) for i in range(16)])
+        r+=metrics_lines('si4703_reads_total','counter','RDS register reads with data ready',[('',c[0])])
+        r+=metrics_lines('si4703_duplicate_reads_total','counter','RDS reads of a group already read',[('',c[1])])
+        r+=metrics_lines('si4703_lost_groups_total','counter','RDS groups missed between reads, estimated from the gaps',[('',c[3])])
+
+        b=self.loopbkt
+        n=0;buckets=[]
+        for le,x in zip(METRICS_LOOP_BUCKETS+('+Inf',),b):
+          n+=x
+          buckets.append((f'le="{le}"',n))
+        r+=metrics_lines('si4703_poll_seconds','histogram','poll loop iteration time',[])
+        r+=[f'si4703_poll_seconds_bucket{{{l}}} {v}\n' for l,v in buckets]
+        r+=[f'si4703_poll_seconds_sum {self.loopsum:.6f}\n',f'si4703_poll_seconds_count {n}\n']
+
+        radio=self.radio
+        if radio!=None:
+          st=radio.si4703_registers[radio.SI4703_STATUSRSSI]
+          r+=metrics_lines('si4703_frequency_mhz','gauge','tuned frequency',[('',self.channel/10)])
+          r+=metrics_lines('si4703_rssi','gauge','received signal strength, dBuV',[('',st&0xff)])
+          r+=metrics_lines('si4703_stereo','gauge','1 when stereo pilot detected',[('',(st>>radio.SI4703_STEREO)&1)])
+          r+=metrics_lines('si4703_i2c_transactions_total','counter','I2C transactions with the chip',
+                           [('op="read"',radio.i2c_reads),('op="write"',radio.i2c_writes)])
+          r+=metrics_lines('si4703_i2c_errors_total','counter','failed I2C transactions',[('',radio.i2c_errors)])
+          ts=radio.tune_stat
+          r+=metrics_lines('si4703_tune_seconds','summary','seek/tune latency, until the chip reports completion',[])
+          for op in ('seek','tune'):
+            r+=[f'si4703_tune_seconds_sum{{op="{op}"}} {ts[op][1]:.6f}\n',f'si4703_tune_seconds_count{{op="{op}"}} {ts[op][0]}\n']
+          r+=metrics_lines('si4703_tune_last_seconds','gauge','latency of the last seek/tune',[(f'op="{op}"',f'{ts[op][2]:.6f}') for op in ('seek','tune')])
+        return ''.join(r)
+
+
+# server for '--metrics' argument: port or host:port
+def metrics_start(spec='9703'):
+    host,_,port=spec.rpartition(':')
+    return metrics_server(host,int(port))
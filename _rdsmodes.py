@@ -0,0 +1,347 @@
+
+# noninteractive chip modes: station scan, RDS data dumps in rds-spy and pcap format
+
+from time import sleep
+from sys import stdout, stderr
+
+from _rdsconfig import FREQ_FROM, FREQ_TO, TUNERS
+from _rdsutil import natsort, p, fmtfreq, getchanrssi, timing_mark
+from _rdsradio import getradio
+import _rdsdecoder as dec
+from _rdsstations import db_station_save
+from _rdsdecoder import rds_initstr, rds_getmem, rds_getodagrpname, handlerds, handlerds_dump, handlerds_get_raw, rds_clock_now
+
+
+SCAN_NAME_TIMEOUT=500   # max number of 5-millisecond intervals to check
+SCAN_VERIFY_READS=60    # incremental scan: 5-millisecond intervals at least, on a known station
+SCAN_VERIFY_GRPS=12     # incremental scan: groups at least, on a known station
+
+
+
+def rdsloop_getstationname(channel,radio,minreads=300,mingrps=80):
+    station_name=''
+    rdscnt=0
+    if True: # get station name from RDS, group 0A
+      for t in range(0,max(SCAN_NAME_TIMEOUT,minreads)):
+        sleep(0.005)
+        radio.si4703ReadRegisters()
+        if radio.isrds(): handlerds(channel,radio,out=False);rdscnt+=1
+        station_name=rds_getmem('0A',quot='')
+        if (t>minreads and rdscnt>mingrps) or (rdscnt<2 and t>100):
+          if '_' not in station_name: break
+          if rdscnt<2 and t>100: break # do not wait when there are no data
+      #station_name=station_name.strip()
+    return station_name,t,rdscnt
+
+
+# dwell on the tuned station: name from RDS, group counts, ODA, AF; recorded in the station database
+# returns name and the rest of the scan table line, after frequency and RSSI
+def scan_station(channel,radio,getrdsname=True,getrds=True):
+    station_name=''
+    if getrdsname:
+      if getrds: station_name,timespent,rdscnt=rdsloop_getstationname(channel,radio,minreads=500,mingrps=80)
+      else:      station_name,timespent,rdscnt=rdsloop_getstationname(channel,radio,minreads=100,mingrps=30)
+    s='  ['+station_name+']'
+    if getrds:
+      s+='   '
+      for x in natsort(dec.rds_stat): s+=f'{x: >3}:{dec.rds_stat[x]: <3}'
+      for x in dec.rds_odagrps:
+        s+='  ODA:'+x+':'+str(dec.rds_odagrpscnt[x])+':'+rds_getodagrpname(x,threshold=0)
+      for l in dec.rds_af_lists(dec.rds_pic,channel):
+        s+=f'  AF{l.method}:'+str(len(dec.rds_af_channels(l)))
+      db_station_save(channel,radio.si4703getRssi())
+    return station_name,s
+
+
+# skip: channels passed without dwelling (already confirmed by the incremental scan)
+def stations_scan(radio,getrdsname=True,prefix='',verb=True,out=True,getrds=True,skip=()):
+    channel=radio.si4703GetChannel()
+    #firstchan=channel
+    #through=False
+    chans={}
+
+    if out and verb: print('scan start');print('          freq  rssi      name      badgrp  seen RDS group counts')
+    """ scan start
+        freq  rssi      name      badgrp  seen RDS group counts
+STATION:  89.5 14    [COUNTRY ]    --:0   0A:20  2A:20 10A:20
+STATION:  90.3 12    [EXPRESFM]    --:10  0A:45  2A:5
+STATION:  92.6  4    [R-PLUS  ]    --:52  0A:6   2A:1   8A:1
+STATION:  93.7 13    [CITY 937]    --:2   0A:36  2A:18  3A:2  11A:2
+STATION:  94.1 11    [  FAJN  ]    --:5   0A:34  2A:17  3A:2  11A:2
+STATION:  94.6  3    [R-ZURNAL]    --:0   0A:30  1A:5   2A:7   3A:4   8A:11
+STATION:  95.3 15    [  BEAT  ]    --:0   0A:20  2A:20 10A:19
+STATION:  95.7 13    [ SIGNAL ]    --:1   0A:29  2A:30
+STATION:  96.6  3    [ IMPULS ]    --:13  0A:32  2A:15
+STATION:  98.6 14    [CLASSIC ]    --:0   0A:54  2A:6
+STATION:  98.7 14    [CLASSIC ]    --:0   0A:53  2A:7
+STATION: 105.0  0    [R-VLTAVA]    --:0   0A:40  2A:10 14A:10
+scan end """
+
+    while True:
+      dec.rds_retune(channel)
+      station_name=''
+
+      if channel!=FREQ_FROM and channel!=FREQ_TO and channel not in skip: # ends, where the scan stops and there are no data
+        if out: p(prefix+'STATION: '+getchanrssi(channel,radio,spacer='  '))
+        station_name,s=scan_station(channel,radio,getrdsname,getrds)
+        if out: p(s);print()
+      chans[channel]=station_name
+      radio.si4703SeekUp(out=False)
+      channel=radio.si4703GetChannel()
+      #print(chans)
+      if channel in chans: # already seen
+        if out and verb: print('scan end')
+        break
+    return chans
+
+
+
+
+
+# tune directly; True if the RSSI passes the chip's own seek threshold and AFC is not railed
+def scan_tune(radio,channel):
+    radio.si4703SetChannel(channel,out=False)
+    radio.si4703ReadRegisters()
+    st=radio.si4703_registers[radio.SI4703_STATUSRSSI]
+    return st&0xff>=radio.si4703_registers[radio.SI4703_SYSCONFIG2]>>radio.SI4703_SEEKTH and not (st>>radio.SI4703_AFCRL)&1
+
+
+# incremental scan: stations known from the database are tuned directly and confirmed (PI, PS) by a short dwell,
+# then the band is seeked for new ones, dwelling only where nothing was confirmed;
+# known stations found by neither are marked stale in the database, not dropped
+def stations_rescan(radio,getrdsname=True,out=True):
+    from time import time
+    from _rdsstations import db_known, db_station_seen, db_mark_stale
+    start=time()
+    known=db_known()
+    ok={}
+    if out: print(f'rescan start, {len(known)} known');print('          freq  rssi      name      badgrp  seen RDS group counts')
+    for channel in sorted(known):
+      dec.rds_retune(channel)
+      name=''
+      if scan_tune(radio,channel): name,_,_=rdsloop_getstationname(channel,radio,minreads=SCAN_VERIFY_READS,mingrps=SCAN_VERIFY_GRPS)
+      pi=dec.rds_pic
+      if out: p('STATION: '+getchanrssi(channel,radio,spacer='  ')+'  ['+(name or '_'*8)+']    ')
+      if pi in known[channel]:
+        ok[channel]=name if '_' not in name else known[channel][pi]
+        db_station_seen(channel,pi,radio.si4703getRssi(),name if '_' not in name else '')
+        if out: print('verified')
+      elif pi>=0:
+        if out: print(f'PI {pi:04x}, known '+' '.join(f'{x:04x}' for x in known[channel]))
+      elif out: print('not received')
+    radio.si4703SetChannel(FREQ_FROM,out=False) # seek through the band from its start, as the full scan
+    chans=stations_scan(radio,getrdsname=getrdsname,verb=False,out=out,skip=ok)
+    stale=db_mark_stale(start)
+    if out: print(f'scan end: {len(ok)} verified, {len([c for c in chans if c not in ok and c not in (FREQ_FROM,FREQ_TO)])} by seek, {stale} stale')
+    chans.update(ok)
+    return chans
+
+
+###############################
+##
+##  parallel scan, several tuners
+##
+###############################
+
+# direct-tune every channel of lo..hi, dwell where there is a station (scan_tune)
+# yields (channel, name, scan table line)
+def scan_range(radio,lo,hi,getrdsname=True,getrds=True):
+    for channel in range(lo,hi+1):
+      if not scan_tune(radio,channel): continue # weak, or AFC railed: no station
+      dec.rds_retune(channel)
+      line='STATION: '+getchanrssi(channel,radio,spacer='  ')
+      name,s=scan_station(channel,radio,getrdsname,getrds)
+      yield channel,name,line+s
+
+# process body: own radio, own decoder state; results and the end go to the queue
+def scan_worker(n,bus,rstpin,lo,hi,q,init,getrdsname,getrds):
+    import _rdsstations
+    _rdsstations.db=None # connection of the parent is not usable here, open a new one
+    err=''
+    try:
+      radio=getradio(bus,rstpin)
+      if init or not radio.si4703isInitialized():
+        radio.si4703Init();radio.si4703Init() # double init, as main_scan
+      radio.si4703InitPwr()
+      for x in scan_range(radio,lo,hi,getrdsname,getrds): q.put(x)
+    except BaseException as e: err=f'tuner {n} (bus {bus}): {e!r}'
+    finally: q.put((None,n,err))
+
+# band split among the tuners, one process each, scanning at the same time; one table sorted by frequency
+def stations_scan_parallel(tuners=TUNERS,init=False,getrdsname=True,getrds=True,out=True):
+    from multiprocessing import get_context
+    from queue import Empty
+    ctx=get_context('fork')
+    q=ctx.Queue()
+    n=len(tuners)
+    width=FREQ_TO-FREQ_FROM+1
+    procs=[]
+    for i,(bus,rstpin) in enumerate(tuners):
+      lo=FREQ_FROM+width*i//n
+      hi=FREQ_FROM+width*(i+1)//n-1
+      procs.append(ctx.Process(target=scan_worker,args=(i,bus,rstpin,lo,hi,q,init,getrdsname,getrds),daemon=True))
+    for pr in procs: pr.start()
+    rows=[]
+    running=n
+    while running>0:
+      try: x=q.get(timeout=1)
+      except Empty:
+        if not any(pr.is_alive() for pr in procs): break # died without a word
+        continue
+      if x[0]==None:
+        running-=1
+        if x[2]!='': print('ERROR:',x[2])
+      else: rows.append(x)
+      if out: p(f'scanning: {n} tuners, {n-running} done, {len(rows)} stations\r')
+    for pr in procs: pr.join(1)
+    rows.sort()
+    if out:
+      p(' '*50+'\r')
+      print('scan start');print('          freq  rssi      name      badgrp  seen RDS group counts')
+      for r in rows: print(r[2])
+      print('scan end')
+    return {c:name for c,name,_ in rows}
+
+
+# run the station-scan loop; with several TUNERS configured the band is split among them
+# incremental: confirm the known stations first, see stations_rescan(); on the configured tuner only
+def main_scan(init=False,deinit=False,getrdsname=True,verb=False,incremental=False):
+    if len(TUNERS)>1 and not incremental:
+      stations_scan_parallel(TUNERS,init=init,getrdsname=getrdsname)
+      if deinit:
+        for bus,rstpin in TUNERS: getradio(bus,rstpin).si4703ShutDown(verb=verb)
+      return
+    radio = getradio()
+    if init or not radio.si4703isInitialized():
+      radio.si4703Init(verb=verb); # double init, for some reason it is needed
+      radio.si4703Init(verb=verb);
+    else: radio.si4703InitPwr()
+    radio.si4703InitPwr()
+    timing_mark('chip init')
+    if incremental: stations_rescan(radio,getrdsname=getrdsname)
+    else: stations_scan(radio,getrdsname=getrdsname)
+    if deinit:
+      if verb: print();print('chip power-off')
+      radio.si4703ShutDown(verb=verb)
+
+
+
+# rds-spy log header line, with freq and datetime
+def dump_header(station_name,channel,printheader=True):
+    if not printheader: return '<recorder="Si4703-shad" date="2019-05-04" time="22-14-20" source="1" name="" location="" notes="">'
+    from datetime import datetime
+    now=datetime.fromtimestamp(rds_clock_now())
+    return f'<recorder="Si4703-shad" date="{now:%Y-%m-%d}" time="{now:%H-%M-%S}" source="1" name="{station_name}" location="" notes="'+fmtfreq(channel,pad=' ').strip()+' MHz">'
+
+# output file instead of stdout, rotated by size or interval ('100M', '1h'), compressed ('gzip', 'xz'); see _rdsrotate.py
+def dump_openout(outpath,rotate='',compress=''):
+    from _rdsrotate import rotating_out, rotate_spec
+    size,interval=rotate_spec(rotate) if rotate!='' else (0,0)
+    return rotating_out(outpath,size=size,interval=interval,compress=compress)
+
+# flush and close the output; a failure of the rotating output's writer thread (disk full) is reported here, False
+def dump_closeout(out,w=None):
+    try:
+      if w!=None: w.flush()
+      out.flush()
+      if out not in (stdout,stdout.buffer): out.close()
+    except OSError as e: print('ERROR:',e,file=stderr);return False
+    return True
+
+
+# run the data dumping loop
+# index: path of a time index sidecar to write along, see _rdsindex.py
+# outpath, rotate, compress: write to rotated/compressed files instead of stdout, see dump_openout()
+# remotes: update() every loop, as in interactive mode (metrics, see _rdsmetrics.py)
+def main_dump(init=False,initwait=False,corrthreshold=2,getrdsname=True,printheader=True,verb=False,clocksync=False,index='',
+              outpath='',rotate='',compress='',remotes=[]):
+    if index!='' and (rotate!='' or compress!=''):
+      print('ERROR: time index needs a single uncompressed log, not rotation or compression');return
+    out=stdout
+    if outpath!='': out=dump_openout(outpath,rotate,compress)
+    dec.RDS_CLOCK_DISCIPLINE=clocksync
+    rds_initstr()
+    radio = getradio()
+    if init or not radio.si4703isInitialized(): radio.si4703Init(verb=verb)
+    else: radio.si4703InitPwr()
+    timing_mark('chip init')
+    channel=radio.si4703GetChannel()
+    station_name=''
+
+    if getrdsname: # get station name from RDS, group 0A
+      station_name,_,_=rdsloop_getstationname(channel,radio)
+      if station_name=='_'*8: station_name=''
+
+    hdr=dump_header(station_name,channel,printheader)
+    out.write(hdr+'\n')
+    if out!=stdout: out.setheader(lambda: (dump_header(station_name,channel,printheader)+'\n').encode()) # fresh one per file
+
+    idx=None
+    if index!='':
+      from _rdsindex import index_writer
+      idx=index_writer(index)
+    offset=len(hdr.encode())+1 # bytes written so far
+    out.flush()
+
+    lastsec=0
+    try:
+      while True:
+        radio.si4703ReadRegisters()
+        for r in remotes: r.update(channel,radio)
+        if radio.isrds():
+          r=handlerds_dump(radio,out=out)
+          if r==None: continue
+          if int(r[0])!=lastsec: # lines are buffered, flushed once a second for live readers
+            lastsec=int(r[0])
+            out.flush()
+          if idx==None: continue
+          idx.add(r[0],offset)
+          offset+=r[1]
+    except KeyboardInterrupt:
+      pass
+    except OSError:
+      if getattr(out,'err',None)==None: raise # not the output, reported by dump_closeout()
+    ok=dump_closeout(out)
+    if idx!=None: idx.close()
+    return ok
+
+
+
+# run the data dumping loop in a binary format to stdout: pcap, pcapng (with per-packet comments), bin (compact records),
+# or json (NDJSON raw groups and decoded state events)
+def main_dump_binary(init=False,initwait=False,corrthreshold=2,getrdsname=True,printheader=True,verb=False,clocksync=False,fmt='pcap',
+                     outpath='',rotate='',compress='',remotes=[]):
+    out=stdout.buffer
+    if outpath!='': out=dump_openout(outpath,rotate,compress)
+    dec.RDS_CLOCK_DISCIPLINE=clocksync
+
+    rds_initstr()
+    radio = getradio()
+    if init or not radio.si4703isInitialized(): radio.si4703Init(verb=verb)
+    else: radio.si4703InitPwr()
+    timing_mark('chip init')
+    channel=radio.si4703GetChannel()
+
+    if fmt=='bin':
+      from _rdsbin import rdsb_writer
+      w=rdsb_writer(out,channel,rds_clock_now())
+    elif fmt=='json':
+      from _rdsjson import json_start
+      w=json_start(out,clock=rds_clock_now)
+    else:
+      from _rdspcap import pcap_writer, pcapng_writer
+      w=[pcap_writer,pcapng_writer][fmt=='pcapng'](out,channel)
+    if outpath!='': out.setheader() # file header of the writer starts every file
+    try:
+      while True:
+        radio.si4703ReadRegisters()
+        for r in remotes: r.update(channel,radio)
+        if radio.isrds():
+          ok,packet,corr=handlerds_get_raw(radio)
+          if not ok: continue
+          w.write(packet,rds_clock_now(),rssi=radio.si4703getRssi(),corr=corr)
+    except KeyboardInterrupt:
+      pass
+    except OSError:
+      if getattr(out,'err',None)==None: raise
+    return dump_closeout(out,w)
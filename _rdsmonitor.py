@@ -0,0 +1,129 @@
+
+# time-sliced monitor (monitor): one tuner cycles through a list of stations, by default the known ones carrying TMC
+# each station keeps its whole decoder state between visits (rds_state_take/put in _rdsdecoder.py), so the TMC list,
+# EON and AF keep growing as if received continuously, only with gaps; a visit is as long as the station was productive:
+# new TMC messages and EON networks per second tuned, averaged over the recent visits, scale the dwell between the limits
+# (relative to the most productive station), a station with nothing new for a while is only checked briefly
+#   MONITOR:  94.1   8  [  YM__  ]  dwell  6.2s  grps  68  tmc  12 +3   eon  4 +0
+# coverage report (time share, groups, longest gap between visits) every MONITOR_REPORT rounds and at the end
+
+from time import sleep, monotonic
+
+from _rdsutil import p, fmtfreq, getchanrssi, timing_mark
+from _rdsradio import getradio
+from _rdsstations import db_query, db_station_save, db_close
+import _rdsdecoder as dec
+
+MONITOR_DWELL_MIN=3.0   # seconds per visit, station with nothing new recently
+MONITOR_DWELL_MAX=15.0  # seconds per visit, the most productive station; also the first visit of each
+MONITOR_DECAY=0.5       # weight of the last visit in the new-data rate
+MONITOR_RATE_FULL=0.05  # new items per second tuned that earn the longest dwell at least, lower rates are relative to it
+MONITOR_REPORT=10       # rounds between coverage reports, 0 = at the end only
+MONITOR_POLL=0.005      # seconds between register reads
+
+
+class monitor_station(object):
+    def __init__(self,chan,name='_'*8):
+        self.chan=chan
+        self.name=name
+        self.state=None   # decoder state between visits, None before the first
+        self.rate=0.0     # new items per second tuned, decayed average
+        self.visits=0
+        self.time=0.0     # seconds tuned
+        self.grps=0
+        self.tmc=0
+        self.eon=0
+        self.tleft=0      # when last left
+        self.maxgap=0.0   # longest time between visits
+
+# items counted as new data: TMC messages, EON networks (seen more than once, not noise)
+def monitor_items():
+    return len(dec.rds_tmclist),len([e for e in dec.rds_eon.values() if e.cnt>=2])
+
+def monitor_dwell(s,stations):
+    if s.state==None: return MONITOR_DWELL_MAX
+    top=max([x.rate for x in stations]+[MONITOR_RATE_FULL])
+    return MONITOR_DWELL_MIN+(MONITOR_DWELL_MAX-MONITOR_DWELL_MIN)*s.rate/top
+
+# one visit: tune, continue with the station's state, poll for dwell seconds, record and keep the state
+def monitor_visit(radio,s,dwell,remotes=[]):
+    radio.si4703SetChannel(s.chan,out=False)
+    dec.rds_state_put(s.state,s.chan)
+    tmc0,eon0=monitor_items()
+    t0=monotonic()
+    if s.tleft: s.maxgap=max(s.maxgap,t0-s.tleft)
+    while monotonic()-t0<dwell:
+      sleep(MONITOR_POLL)
+      radio.si4703ReadRegisters()
+      for r in remotes: r.update(s.chan,radio)
+      if radio.isrds(): dec.handlerds(s.chan,radio,out=False)
+    s.tleft=monotonic()
+    s.time+=s.tleft-t0
+    s.visits+=1
+    s.tmc,s.eon=monitor_items()
+    new=s.tmc-tmc0+s.eon-eon0
+    s.rate=MONITOR_DECAY*new/dwell+(1-MONITOR_DECAY)*s.rate if s.visits>1 else new/dwell
+    grps=sum(dec.rds_stat.values())-dec.rds_stat.get('--',0)
+    s.name=dec.rds_getmem('0A',quot='')
+    p('MONITOR: '+getchanrssi(s.chan,radio,spacer='  ')+f'[{s.name}]  dwell {dwell:4.1f}s  grps {grps-s.grps:3}  ')
+    print(f'tmc {s.tmc:3} +{s.tmc-tmc0:<3} eon {s.eon:2} +{s.eon-eon0}')
+    s.grps=grps
+    db_station_save(s.chan,radio.si4703getRssi())
+    s.state=dec.rds_state_take()
+
+def monitor_report(stations,tstart):
+    total=monotonic()-tstart
+    print()
+    print('  freq    name      visits  tuned  share  grps  grp/s  tmc  eon  max gap')
+    for s in stations:
+      print(f'{fmtfreq(s.chan,pad=" ")}  [{s.name}]  {s.visits:5}  {s.time:5.0f}s  {s.time/total:4.0%}  {s.grps:5}  {s.grps/s.time if s.time else 0:5.1f}  '
+            f'{s.tmc:3}  {s.eon:3}  {s.maxgap:6.0f}s')
+    print()
+
+# decoded TMC messages and EON of every station, from the kept states
+def monitor_show(stations):
+    for s in stations:
+      if s.state==None: continue
+      dec.rds_state_put(s.state,s.chan)
+      print(f'{fmtfreq(s.chan,pad=" ").strip()} [{s.name}]')
+      dec.rds_tmclist_show()
+      dec.rds_eon_show()
+      print()
+      s.state=dec.rds_state_take()
+
+# stations from arguments: frequencies in MHz, or database filters as for the stations command (default tmc)
+def monitor_stations(args=[]):
+    freqs=[x for x in args if x.replace('.','',1).isdigit()]
+    if freqs!=[]: return [monitor_station(round(float(x)*10)) for x in freqs]
+    r={}
+    for chan,pi,ps,pty,rssi,tmc,rtplus,eon,stale,*_ in db_query(args or ['tmc']):
+      if (stale==0 or 'stale' in args) and chan not in r: r[chan]=monitor_station(chan,ps)
+    db_close()
+    return list(r.values())
+
+
+def main_monitor(args=[],init=False,deinit=False,tmc=False,verb=False,remotes=[]):
+    try: stations=monitor_stations(args)
+    except ValueError as e: print('ERROR:',e);return
+    if stations==[]: print('no stations to monitor, scan first or give frequencies');return
+    dec.rds_initstr()
+    radio=getradio()
+    if init or not radio.si4703isInitialized(): radio.si4703Init(verb=verb)
+    else: radio.si4703InitPwr()
+    timing_mark('chip init')
+    print('monitor start,',len(stations),'stations:',' '.join(fmtfreq(s.chan,pad=' ').strip() for s in stations))
+    tstart=monotonic()
+    rounds=0
+    cur=None
+    try:
+      while True:
+        for cur in stations: monitor_visit(radio,cur,monitor_dwell(cur,stations),remotes)
+        rounds+=1
+        if MONITOR_REPORT and rounds%MONITOR_REPORT==0: monitor_report(stations,tstart)
+    except KeyboardInterrupt:
+      print()
+    if cur!=None and dec.rds_pic>=0: cur.state=dec.rds_state_take() # interrupted during a visit, keep what it got
+    if tmc: monitor_show(stations)
+    monitor_report(stations,tstart)
+    db_close()
+    if deinit: radio.si4703ShutDown(verb=verb)
@@ -0,0 +1,270 @@
+
+# MQTT: retained station state topics, published when a value changes, and a command topic for remote control
+#   <prefix>/freq rssi pi ps rt pty tmc status   retained state
+#   <prefix>/cmd                                  command names, see MQTT_COMMANDS; others answered on <prefix>/cmd/rejected
+# the acquisition loop only compares a small snapshot every MQTT_WINDOW seconds and queues the changes;
+# a thread owns the connection: publishes, receives commands, keeps alive, reconnects and republishes.
+# the client is a minimal MQTT 3.1.1 over a socket (QoS 0), no external library;
+# 'loop' instead of a broker address is an in-process stand-in, for trying it out and testing without a broker;
+# 'loop:<file>' appends its publications to file (the terminal belongs to interactive mode)
+
+from time import monotonic
+from threading import Thread
+from queue import Queue, Empty, Full
+from struct import pack
+from sys import stderr
+
+from _rdsconfig import MQTT_HOST, MQTT_PORT, MQTT_PREFIX, RDS_RBDS
+from _rdslists import RDS_RBDS_PTY_TYPES
+from _rdsutil import fmtfreq
+import _rdsdecoder as dec
+
+MQTT_WINDOW=0.5      # seconds changes are coalesced over
+MQTT_QUEUE=256       # queued publications; when full, changes are dropped and picked up by the next window
+MQTT_KEEPALIVE=60
+MQTT_RECONNECT=5.0   # seconds between connection attempts
+
+# accepted commands: the cmd vocabulary (_rdsradio.docommand), and known-station stepping, scan, pause;
+# as keypresses, or names for the ones without a key; nothing that quits or powers the chip off
+MQTT_COMMANDS={'vol+':'+','vol-':'-','volmax':'volmax','getvol':'getvol','ch+':']','ch-':'[','getch':'getch','init':'i',
+               'next':'>','prev':'<','scan':'S','pause':' '}
+
+
+###############################
+##
+##  minimal MQTT 3.1.1 client
+##
+###############################
+
+def mqtt_str(s):
+    b=s.encode()
+    return pack('>H',len(b))+b
+
+def mqtt_packet(ptype,body):
+    n=len(body)
+    l=bytearray()
+    while True: # remaining length, 7 bits per byte
+      l.append((n&0x7f)|(0x80 if n>0x7f else 0))
+      n>>=7
+      if n==0: break
+    return bytes((ptype,))+bytes(l)+body
+
+class mqtt_client(object):
+    def __init__(self,host,port=MQTT_PORT,clientid='si4703rds',will=None):
+        self.host=host
+        self.port=port
+        self.clientid=clientid
+        self.will=will   # (topic,payload), retained, published by the broker if we vanish
+        self.sock=None
+        self.rbuf=b''
+
+    def connect(self):
+        import socket
+        self.sock=socket.create_connection((self.host,self.port),timeout=5)
+        flags=0x02 # clean session
+        payload=mqtt_str(self.clientid)
+        if self.will!=None:
+          flags|=0x04|0x20 # will, retained
+          payload+=mqtt_str(self.will[0])+mqtt_str(self.will[1])
+        self.sock.sendall(mqtt_packet(0x10,mqtt_str('MQTT')+bytes((4,flags))+pack('>H',MQTT_KEEPALIVE)+payload))
+        x=self.readpacket(5)
+        if x==None: raise OSError('MQTT broker did not answer')
+        ptype,body=x
+        if ptype!=0x20 or len(body)<2 or body[1]!=0: raise OSError(f'MQTT connection refused: {body.hex()}')
+
+    def publish(self,topic,payload,retain=True):
+        self.sock.sendall(mqtt_packet(0x30|int(retain),mqtt_str(topic)+payload.encode()))
+
+    def subscribe(self,topic):
+        self.sock.sendall(mqtt_packet(0x82,pack('>H',1)+mqtt_str(topic)+b'\x00'))
+
+    def ping(self):
+        self.sock.sendall(b'\xc0\x00')
+
+    def close(self):
+        if self.sock==None: return
+        try: self.sock.sendall(b'\xe0\x00')
+        except OSError: pass
+        self.sock.close()
+        self.sock=None
+
+    # one packet as (type byte, body), None if not complete within timeout
+    def readpacket(self,timeout=0):
+        from select import select
+        while True:
+          if len(self.rbuf)>=2:
+            n=0;i=1
+            while i<len(self.rbuf) and i<5:
+              n|=(self.rbuf[i]&0x7f)<<(7*(i-1))
+              if self.rbuf[i]&0x80==0: break
+              i+=1
+            else: i=-1
+            if i>0 and len(self.rbuf)>=i+1+n:
+              ptype,body=self.rbuf[0],self.rbuf[i+1:i+1+n]
+              self.rbuf=self.rbuf[i+1+n:]
+              return ptype,body
+          if select([self.sock],[],[],timeout)[0]==[]: return None
+          b=self.sock.recv(4096)
+          if not b: raise OSError('MQTT connection closed')
+          self.rbuf+=b
+
+    # incoming publications as [(topic,payload)]
+    def read(self,timeout=0):
+        r=[]
+        while True:
+          x=self.readpacket(timeout)
+          if x==None: return r
+          timeout=0
+          ptype,body=x
+          if ptype&0xf0!=0x30: continue # acks, ping responses
+          n=(body[0]<<8)|body[1]
+          i=2+n+(2 if ptype&0x06 else 0) # packet id with QoS>0
+          r.append((body[2:2+n].decode('utf-8','replace'),body[i:].decode('utf-8','replace')))
+
+
+# in-process stand-in with the client interface; keeps retained topics, commands are injected
+class mqtt_loopback(object):
+    def __init__(self,log=None):
+        self.retained={}
+        self.inbox=Queue()
+        self.log=log     # text stream for the publications, or None
+    def connect(self): pass
+    def publish(self,topic,payload,retain=True):
+        if retain: self.retained[topic]=payload
+        if self.log!=None: self.log.write(f'{topic} {payload}\n');self.log.flush()
+    def subscribe(self,topic): pass
+    def ping(self): pass
+    def close(self):
+        if self.log!=None: self.log.close()
+    def inject(self,topic,payload): self.inbox.put((topic,payload))
+    def read(self,timeout=0):
+        r=[]
+        try:
+          r.append(self.inbox.get(timeout=timeout) if timeout>0 else self.inbox.get_nowait())
+          while True: r.append(self.inbox.get_nowait())
+        except Empty: return r
+
+
+###############################
+##
+##  state publisher
+##
+###############################
+
+class mqtt_sink(object):
+    def __init__(self,client,prefix=MQTT_PREFIX):
+        self.client=client
+        self.prefix=prefix
+        self.last={}           # snapshot last queued
+        self.tnext=0
+        self.dropped=0
+        self.rejected=0        # unknown command payloads
+        self.error=''          # connection failure, '' while connected or before the first attempt
+        self.q=Queue(MQTT_QUEUE)
+        self.cmds=Queue()
+        self.running=True
+        self.th=Thread(target=self.worker,daemon=True)
+        self.th.start()
+
+    # station state as {topic suffix: text}; registers as last read, no chip access
+    def snapshot(self,channel,radio):
+        pty=dec.rds_pty
+        return {'freq':fmtfreq(channel,pad=' ').strip(),
+                'rssi':str(radio.si4703getRssi()),
+                'pi':f'{dec.rds_pic:04X}' if dec.rds_pic>=0 else '',
+                'ps':dec.rds_getmem('0A',quot='').strip('_'), # '_' = not received yet
+                'rt':dec.rds_getmem('2',quot='').split('\\r')[0].rstrip('_ '),
+                'pty':f'{pty} {RDS_RBDS_PTY_TYPES[pty][RDS_RBDS]}' if pty>=0 else '',
+                'tmc':str(len(dec.rds_tmclist))}
+
+    # from the acquisition loop, every iteration; cheap until the window passes
+    def update(self,channel,radio):
+        t=monotonic()
+        if t<self.tnext: return
+        self.tnext=t+MQTT_WINDOW
+        s=self.snapshot(channel,radio)
+        for k,v in s.items():
+          if self.last.get(k)==v: continue
+          try: self.q.put_nowait((k,v))
+          except Full: self.dropped+=1;continue # not remembered, retried next window
+          self.last[k]=v
+
+    # next remote command as keypress character or RADIO_VERBS name, '' if none
+    def command(self):
+        try: return MQTT_COMMANDS[self.cmds.get_nowait()]
+        except Empty: return ''
+
+    def worker(self):
+        c=self.client
+        published={}    # retained state as on the broker, republished after reconnect
+        connected=False
+        tping=tretry=0
+        while self.running:
+          if not connected:
+            if monotonic()<tretry:
+              try: k,v=self.q.get(timeout=0.2);published[k]=v # keep collecting while offline
+              except Empty: pass
+              continue
+            try:
+              c.connect()
+              c.subscribe(self.prefix+'/cmd')
+              c.publish(self.prefix+'/status','online')
+              for k,v in published.items(): c.publish(self.prefix+'/'+k,v)
+              connected=True
+              tping=monotonic()+MQTT_KEEPALIVE/2
+              if self.error!='': print('mqtt: reconnected',file=stderr)
+              self.error=''
+            except OSError as e:
+              self.fail(e)
+              c.close()
+              tretry=monotonic()+MQTT_RECONNECT
+              continue
+          try:
+            try:
+              k,v=self.q.get(timeout=0.05)
+              published[k]=v
+              c.publish(self.prefix+'/'+k,v)
+            except Empty: pass
+            for topic,payload in c.read():
+              if topic!=self.prefix+'/cmd': continue
+              if payload.strip() in MQTT_COMMANDS: self.cmds.put(payload.strip())
+              else:
+                self.rejected+=1
+                c.publish(self.prefix+'/cmd/rejected',payload,retain=False)
+            if monotonic()>=tping:
+              c.ping()
+              tping=monotonic()+MQTT_KEEPALIVE/2
+          except OSError as e:
+            self.fail(e)
+            c.close()
+            connected=False
+            tretry=monotonic()+MQTT_RECONNECT
+        if connected:
+          try:
+            while True:
+              k,v=self.q.get_nowait()
+              c.publish(self.prefix+'/'+k,v)
+          except (Empty,OSError): pass
+          try: c.publish(self.prefix+'/status','offline')
+          except OSError: pass
+          c.close()
+
+    # connection failure; only the first of an outage is printed, the terminal belongs to the status line
+    def fail(self,e):
+        if self.error=='': print('mqtt:',e,file=stderr)
+        self.error=str(e) or type(e).__name__
+
+    def close(self):
+        self.running=False
+        self.th.join(2)
+
+
+# sink for '--mqtt' argument: host[:port], 'loop[:file]' for the in-process stand-in
+def mqtt_start(spec=''):
+    if spec.split(':')[0]=='loop':
+      _,_,path=spec.partition(':')
+      client=mqtt_loopback(open(path,'a') if path!='' else None)
+    else:
+      host,_,port=(spec or MQTT_HOST).partition(':')
+      client=mqtt_client(host,int(port or MQTT_PORT),will=(MQTT_PREFIX+'/status','offline'))
+    return mqtt_sink(client)
@@ -0,0 +1,118 @@
+
+# pcap/pcapng writer for RDS groups, encapsulated in RFtap over UDP/IPv4/Ethernet, for wireshark/tshark
+# the 62-byte link header is built once; per packet only the timestamp, payload and (on retune) frequency are patched
+
+from struct import Struct, pack, pack_into
+from time import monotonic
+
+PCAP_FLUSH_COUNT=64  # packets buffered before write
+PCAP_FLUSH_TIME=1.0  # max seconds a packet stays buffered, keeps live tshark readers current
+
+RFTAP_DLT_RDS=265    # RFtap datalink type of the payload
+LINKTYPE_ETHERNET=1
+
+PCAP_REC=Struct('<LLLL')                  # pcap record header: ts_sec, ts_usec, incl_len, orig_len
+RDS_WORDS=Struct('>HHHH')                 # payload, four big-endian block words
+RFTAP_FREQ=Struct('<d')                   # nominal frequency in the RFtap header, Hz
+PCAPNG_EPB=Struct('<LLLLLLL')             # enhanced packet block head: type, len, interface, ts high, ts low, caplen, len
+PCAPNG_OPT=Struct('<HH')                  # option code, length
+
+HDR_LEN=14+20+8+20   # ethernet, IPv4, UDP, RFtap
+PKT_LEN=HDR_LEN+8    # with four RDS words
+PKT_PAD=-PKT_LEN&3   # pcapng pads packet data to 32 bits
+FREQ_OFFS=14+20+8+12 # frequency field in the RFtap header
+
+# ones' complement checksum of IPv4 header
+def ipv4_checksum(h):
+    s=sum((h[i]<<8)|h[i+1] for i in range(0,len(h),2))
+    while s>0xffff: s=(s&0xffff)+(s>>16)
+    return (~s)&0xffff
+
+# Ethernet/IPv4/UDP/RFtap header for a packet with four RDS words; lengths are constant, so is the IPv4 checksum
+def pcap_header_template(chan=0):
+    udplen=8+20+8
+    arr=bytearray()
+    arr+=bytes((10,2,2,2,2,2))+bytes((10,1,1,1,1,1))+pack('>H',0x0800) # MAC dest, src, IPv4
+    #              vlen serv totlength   ident  flags ttl UDP chksum src_IP    dest_ip
+    ip=bytearray(pack('>BBHHHBBH4s4s',0x45,0x00,udplen+20,0x1234,0,255,17,0,bytes((10,1,1,1)),bytes((10,2,2,2))))
+    pack_into('>H',ip,10,ipv4_checksum(ip))
+    arr+=ip
+    arr+=pack('>HHHH',1,0xcb21,udplen,0) # srcport dstport length, no checksum
+    #                      magic       len(32bit words) flags datalinktype  nominal_freq
+    arr+=pack('<4sHHLd',b'RFta',5,0x0005,RFTAP_DLT_RDS,chan*100000.0)
+    return arr
+
+
+# classic pcap; out is a binary stream
+# subclasses give the file header and the preallocated record (header(), record(), FREQ_POS), and write()
+class pcap_writer(object):
+    FREQ_POS=PCAP_REC.size+FREQ_OFFS # RFtap frequency in the record
+
+    def __init__(self,out,chan=0):
+        self.out=out
+        self.buf=bytearray()   # pending records
+        self.cnt=0
+        self.tflush=monotonic()
+        self.rec=self.record(chan) # preallocated record
+        self.chan=chan
+        self.out.write(self.header())
+
+    def header(self):
+        return pack('<LHHlLLL',0xA1B2C3D4,2,4,0,0,65535,LINKTYPE_ETHERNET)
+
+    def record(self,chan):
+        return bytearray(PCAP_REC.size)+pcap_header_template(chan)+bytearray(RDS_WORDS.size)
+
+    def setchan(self,chan):
+        if chan==self.chan: return
+        self.chan=chan
+        RFTAP_FREQ.pack_into(self.rec,self.FREQ_POS,chan*100000.0)
+
+    # t = unix time of reception
+    def write(self,rds,t,chan=0,rssi=-1,corr=None):
+        if chan: self.setchan(chan)
+        secs=int(t)
+        PCAP_REC.pack_into(self.rec,0,secs,int(1000000*(t-secs)),PKT_LEN,PKT_LEN)
+        RDS_WORDS.pack_into(self.rec,PCAP_REC.size+HDR_LEN,*rds)
+        self.buf+=self.rec
+        self.queued()
+
+    def queued(self):
+        self.cnt+=1
+        if self.cnt>=PCAP_FLUSH_COUNT or monotonic()-self.tflush>=PCAP_FLUSH_TIME: self.flush()
+
+    def flush(self):
+        if self.buf:
+          self.out.write(self.buf)
+          self.buf=bytearray()
+        self.out.flush()
+        self.cnt=0
+        self.tflush=monotonic()
+
+
+# pcapng, with a comment on every packet: frequency, RSSI, block correction levels
+class pcapng_writer(pcap_writer):
+    FREQ_POS=FREQ_OFFS # record is the packet only, the block around it is packed per packet
+
+    def header(self):
+        shb=pack('<LLLHHq',0x0A0D0D0A,28,0x1A2B3C4D,1,0,-1)+pack('<L',28)      # section header, length unknown
+        idb=pack('<LLHHL',1,20,LINKTYPE_ETHERNET,0,65535)+pack('<L',20)        # interface, microsecond timestamps
+        return shb+idb
+
+    def record(self,chan):
+        return pcap_header_template(chan)+bytearray(RDS_WORDS.size+PKT_PAD)
+
+    def write(self,rds,t,chan=0,rssi=-1,corr=None):
+        if chan: self.setchan(chan)
+        RDS_WORDS.pack_into(self.rec,HDR_LEN,*rds)
+        c=(f'{self.chan//10}.{self.chan%10} MHz' if self.chan else '')+f' rssi={rssi}'
+        if corr!=None: c+=' corr='+''.join(str(x) for x in corr)
+        c=c.strip().encode()
+        optlen=PCAPNG_OPT.size+((len(c)+3)&~3)
+        blen=PCAPNG_EPB.size+PKT_LEN+PKT_PAD+optlen+PCAPNG_OPT.size+4
+        ts=int(t*1000000)
+        self.buf+=PCAPNG_EPB.pack(6,blen,0,ts>>32,ts&0xffffffff,PKT_LEN,PKT_LEN)
+        self.buf+=self.rec
+        self.buf+=PCAPNG_OPT.pack(1,len(c))+c+bytes(-len(c)&3)
+        self.buf+=PCAPNG_OPT.pack(0,0)+pack('<L',blen)
+        self.queued()
@@ -0,0 +1,146 @@
+
+# chip access for the commandline: radio object creation, chip commands, configuration dump
+# only the hardware library is imported here, and only when a radio object is requested
+
+from time import sleep
+from sys import exit
+
+from _rdsconfig import HARDWARE, I2C_BUS, PIN_RESET, PIN_IRQ, Si4703_I2C_ADDR
+from _rdsutil import fmtfreq, timing_mark
+
+
+##############
+##
+##  radio init
+##
+##############
+
+# bus, rstpin: another tuner than the configured one (parallel scan, TUNERS)
+def getradio(bus=I2C_BUS,rstpin=PIN_RESET):
+    # skip loading chip-specific stuff until it is needed, allow log parsing and help generation on non-raspi machines
+    try:
+      from _libsi4703 import si4703Radio
+    except Exception as e:
+      s=str(e)
+      print('ERROR: failed line: from _libsi4703 import si4703Radio')
+      print('ERROR:',e)
+      if 'RPi' in s: print('ERROR: Not running on raspberry pi? Or try "pip install RPi"')
+      if 'smbus' in s: print('ERROR: try "pip install smbus"')
+      exit(1)
+    timing_mark('import _libsi4703')
+    if HARDWARE not in ['raspi','none']:
+      print('ERROR: unknown hardware:',HARDWARE)
+      raise(BaseException('unknown hardware definition'))
+    irq=PIN_IRQ if bus==I2C_BUS else -1 # interrupt wired for the configured tuner only
+    if HARDWARE=='raspi': radio=si4703Radio(addr=Si4703_I2C_ADDR, rstpin=rstpin,    irqpin=irq,     bus=bus, hw=HARDWARE)
+    if HARDWARE=='none':  radio=si4703Radio(addr=Si4703_I2C_ADDR, rstpin=-1,        irqpin=-1,      bus=bus, hw=HARDWARE)
+    timing_mark('radio object')
+    return radio
+
+
+# print registers
+def printreg(radio):
+  print()
+  print()
+  radio.si4703ReadRegisters()
+  radio.si4703printreg(hdr=True)
+
+
+# print volume from chip
+def printvol(radio):
+    print('volume:',radio.si4703GetVolume())
+
+
+
+
+
+######################
+##
+##  configuration dump
+##
+######################
+
+def printconfig(hw=True,forceinit=False,verb=False):
+    print('Si4703 hardware configuration:')
+    print()
+    print(f'I2C address:     0x{Si4703_I2C_ADDR:02x} @ bus {I2C_BUS}, /dev/i2c-{I2C_BUS}')
+    print(f'hardware:        {HARDWARE}')
+    print(f'RESET pin (BCM): {PIN_RESET}')
+    print(f'IRQ pin (BCM):   {PIN_IRQ}, GPIO2 on Si4703',end='')
+    if PIN_IRQ<0: print(' (disabled, uses polling)')
+    else: print()
+    #print()
+    #print('preset RDS filters: ',RDS_FILTERS)
+    print()
+    if not hw: return
+    print('interrogating chip:')
+#    if True:
+    try:
+#      print('forceinit:',forceinit)
+      radio = getradio()
+      if forceinit:
+        if verb: print('chip reset and initialization')
+        radio.si4703Init(verb=verb)
+        sleep(0.05) # without sleep sometimes reads as uninitialized
+      else: radio.si4703InitPwr()
+      timing_mark('chip init')
+      radio.si4703ReadRegisters()
+      #exit(0)
+      print()
+      radio.print_version()
+      print()
+      radio.si4703printreg(hdr=True)
+
+      print()
+      print('channel:  ',radio.si4703GetChannel())
+      print('volume:   ',radio.si4703GetVolume())
+
+      if forceinit:
+        if verb: print();print('chip power-off')
+        radio.si4703ShutDown(verb=verb)
+    except Exception as e:
+      estr=str(e)
+      print('ERROR: chip communication failed')
+      print('ERROR:',estr)
+      if '[Errno 2]' in estr: print('ERROR: invalid I2C bus?')
+      elif not forceinit: print('ERROR: is the chip initialized? (try -ci)')
+    print()
+
+
+
+# commands without a keypress in interactive mode, also taken from remote control (see _rdsmqtt.py)
+RADIO_VERBS=('volmax','getvol','getch')
+
+def radio_verb(radio,cmd):
+  if cmd=='volmax':
+    radio.si4703SetVolume(15)
+    printvol(radio)
+  if cmd=='getvol':
+    printvol(radio)
+  if cmd=='getch':
+    chan=radio.si4703GetChannel()
+    print('freq='+fmtfreq(chan,pad=' '))
+
+def docommand(cmd,forceinit=False,verb=True):
+  radio = getradio()
+  if forceinit or cmd=='init':
+    if verb: print('chip reset and initialization')
+    radio.si4703Init(verb=verb)
+    sleep(0.05) # without sleep sometimes reads as uninitialized
+  else: radio.si4703InitPwr()
+  timing_mark('chip init')
+  if cmd=='vol-': 
+    radio.si4703SetVolume(radio.si4703GetVolume()-1)
+    printvol(radio)
+  if cmd=='vol+': 
+    radio.si4703SetVolume(radio.si4703GetVolume()+1)
+    printvol(radio)
+  if cmd in RADIO_VERBS: radio_verb(radio,cmd)
+  if cmd=='ch-':
+    radio.si4703SeekDown()
+    chan=radio.si4703GetChannel()
+    print('freq='+fmtfreq(chan,pad=' '))
+  if cmd=='ch+':
+    radio.si4703SeekUp()
+    chan=radio.si4703GetChannel()
+    print('freq='+fmtfreq(chan,pad=' '))
@@ -0,0 +1,132 @@
+
+# rotating, compressing output for long dumps (dump --out file --rotate 100M|1h --gzip|--xz)
+# the dump loop only appends to a buffer; a writer thread streams the chunks into the current segment,
+# compressing on the way, so neither compression nor SD card writes stall group acquisition.
+# segments are written as <name>.part and renamed when complete, every segment starts with the file header
+# the queue is bounded: if the thread falls behind the dump waits; a failure of the thread (disk full, permissions)
+# is raised as OSError by the next write, flush or rotation
+
+from time import time, localtime, strftime
+from os.path import splitext
+from os import replace
+from threading import Thread
+from queue import Queue
+
+ROTATE_GZIP_LEVEL=6
+ROTATE_XZ_PRESET=3   # higher presets need more memory and CPU than a Pi Zero spares
+ROTATE_EXT={'':'','gzip':'.gz','xz':'.xz'}
+ROTATE_QUEUE=64      # chunks queued for the writer thread, about a minute of dump at one flush a second
+
+
+# '100M', '512k', '2G' -> (bytes,0); '30m', '1h', '1d', '90s' -> (0,seconds)
+def rotate_spec(s):
+    n,u=s[:-1],s[-1:]
+    try: n=float(n)
+    except ValueError: n=-1
+    if n<=0: raise ValueError('bad rotation: '+s)
+    if u in ('k','K','M','G'): return int(n*{'k':1<<10,'K':1<<10,'M':1<<20,'G':1<<30}[u]),0
+    if u in ('s','m','h','d'): return 0,int(n*{'s':1,'m':60,'h':3600,'d':86400}[u])
+    raise ValueError('rotation must be size (k, M, G) or interval (s, m, h, d): '+s)
+
+
+# writer thread: opens, fills and finishes segments as the queue says;
+# after a failure, stored in o.err for the dump, it only empties the queue, so the dump never blocks on it
+def rotate_worker(q,o):
+    f=None;part=''
+    while True:
+      x=q.get()
+      if x is False: break
+      if o.err!=None: continue
+      try:
+        if type(x) is bytes: f.write(x)
+        elif type(x) is tuple:
+          part,compress=x
+          if compress=='gzip':
+            import gzip
+            f=gzip.open(part,'wb',compresslevel=ROTATE_GZIP_LEVEL)
+          elif compress=='xz':
+            import lzma
+            f=lzma.open(part,'wb',preset=ROTATE_XZ_PRESET)
+          else: f=open(part,'wb')
+        else:
+          f.close();f=None
+          replace(part,part[:-5]) # complete segment appears under its name at once
+      except Exception as e: o.err=e
+    if f!=None:
+      try: f.close()
+      except Exception: pass
+
+
+# binary stream interface (write, flush); str is accepted too, for the text dump
+class rotating_out(object):
+    def __init__(self,path,size=0,interval=0,compress=''):
+        self.path=path
+        self.size=size
+        self.interval=interval
+        self.compress=compress
+        self.header=b''
+        self.hdrlen=0     # header bytes at the start of the current segment
+        self.buf=bytearray()
+        self.written=-1   # bytes in the current segment, -1 = none open
+        self.tnext=0
+        self.name=''
+        self.seq=0
+        self.err=None     # failure of the writer thread
+        self.q=Queue(ROTATE_QUEUE)
+        self.th=Thread(target=rotate_worker,args=(self.q,self),daemon=True)
+        self.th.start()
+
+    # header repeated at the start of every segment: bytes, function returning bytes (fresh header),
+    # or None for what was written so far (file header of the pcap/bin writers)
+    def setheader(self,h=None):
+        if h==None: h=bytes(self.buf)
+        self.header=h
+        if self.written>=0: self.hdrlen=self.written # current segment starts with it already
+
+    def segname(self,t):
+        if self.size==0 and self.interval==0: return self.path+ROTATE_EXT[self.compress]
+        stem,ext=splitext(self.path)
+        name=stem+strftime('-%Y%m%d-%H%M%S',localtime(t))
+        if name==self.name: self.seq+=1 # several segments in one second
+        else: self.name=name;self.seq=0
+        if self.seq>0: name+=f'-{self.seq}'
+        return name+ext+ROTATE_EXT[self.compress]
+
+    def open(self):
+        t=time()
+        self.q.put((self.segname(t)+'.part',self.compress))
+        if self.interval>0: self.tnext=(int(t)//self.interval+1)*self.interval # on interval boundaries of the clock
+        h=self.header() if callable(self.header) else self.header
+        self.buf+=h
+        self.written=self.hdrlen=len(h)
+
+    def check(self):
+        if self.err!=None: raise OSError(f'writing {self.path}: {self.err}')
+
+    def rotate(self):
+        self.flush()
+        self.q.put(None)
+        self.written=-1
+
+    def write(self,data):
+        if type(data) is str: data=data.encode()
+        self.check()
+        if self.written>=0:
+          if (self.size>0 and self.written+len(data)>self.size and self.written>self.hdrlen) or (self.tnext>0 and time()>=self.tnext):
+            self.rotate()
+        if self.written<0: self.open()
+        self.buf+=data
+        self.written+=len(data)
+        return len(data)
+
+    def flush(self):
+        self.check()
+        if self.buf:
+          self.q.put(bytes(self.buf))
+          self.buf=bytearray()
+
+    def close(self):
+        if self.written>=0 and self.err==None: self.rotate()
+        self.q.put(False)
+        self.th.join()
+        self.check()
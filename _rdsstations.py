@@ -0,0 +1,149 @@
+
+# station database: what scans and monitoring learned about the stations, kept in sqlite
+# for queries (stations command) and preset navigation, instead of rescanning the band
+
+from time import time, localtime, strftime
+
+from _rdsconfig import STATIONS_DB, RDS_RBDS
+from _rdslists import ODAAID_TMC, ODAAID_RTPLUS, RDS_RBDS_PTY_TYPES
+from _rdsutil import fmtfreq
+import _rdsdecoder as dec
+
+
+DB_SCHEMA="""
+CREATE TABLE IF NOT EXISTS stations(
+  chan INTEGER NOT NULL,   -- channel, 875 = 87.5 MHz
+  pi INTEGER NOT NULL,
+  ps TEXT,
+  pty INTEGER,
+  rssi INTEGER,
+  tmc INTEGER DEFAULT 0,
+  rtplus INTEGER DEFAULT 0,
+  eon INTEGER DEFAULT 0,
+  oda TEXT,                -- '8A:CD46 11A:4BD7'
+  grps TEXT,               -- '0A:20 2A:21'
+  af TEXT,                 -- AF channels, '877 915'
+  first_seen REAL,
+  last_seen REAL,
+  stale INTEGER DEFAULT 0, -- not found by the last scan
+  PRIMARY KEY(chan,pi));
+CREATE INDEX IF NOT EXISTS stations_pi ON stations(pi);
+CREATE INDEX IF NOT EXISTS stations_pty ON stations(pty);
+"""
+
+DB_MINGRPS=30   # groups received before a station is worth recording
+
+db=None
+
+# open database, create schema; sqlite imported only when needed
+def db_open():
+    global db
+    if db!=None: return db
+    import sqlite3
+    from os.path import expanduser
+    db=sqlite3.connect(expanduser(STATIONS_DB))
+    db.executescript(DB_SCHEMA)
+    if 'stale' not in [r[1] for r in db.execute('PRAGMA table_info(stations)')]: # database of an older version
+      db.execute('ALTER TABLE stations ADD COLUMN stale INTEGER DEFAULT 0')
+    return db
+
+def db_close():
+    global db
+    if db!=None: db.close()
+    db=None
+
+
+# record decoder state of the station tuned on chan; returns False if there is not enough data
+def db_station_save(chan,rssi=-1):
+    if chan==0 or dec.rds_pic<0: return False
+    if sum(dec.rds_stat.values())-dec.rds_stat.get('--',0)<DB_MINGRPS: return False
+    oda={}
+    for g in dec.rds_odagrps:
+      aid=dec.rds_getodagrp(g,threshold=0.05)
+      if aid!='': oda[g]=aid
+    afl=dec.rds_af_lists(dec.rds_pic,chan)
+    now=time()
+    db_open().execute("""INSERT INTO stations(chan,pi,ps,pty,rssi,tmc,rtplus,eon,oda,grps,af,first_seen,last_seen)
+        VALUES(?,?,?,?,?,?,?,?,?,?,?,?,?)
+        ON CONFLICT(chan,pi) DO UPDATE SET ps=excluded.ps,pty=excluded.pty,rssi=excluded.rssi,tmc=excluded.tmc,
+        rtplus=excluded.rtplus,eon=excluded.eon,oda=excluded.oda,grps=excluded.grps,af=excluded.af,last_seen=excluded.last_seen,stale=0""",
+      (chan,dec.rds_pic,dec.rds_getmem('0A',quot=''),dec.rds_pty,rssi,
+       int(ODAAID_TMC in oda.values() or '8A' in dec.rds_stat),int(ODAAID_RTPLUS in oda.values()),int(len(dec.rds_eon)>0),
+       ' '.join(f'{g}:{oda[g]:04X}' for g in oda),dec.getrdsgrpstat(),
+       ' '.join(str(c) for c in dec.rds_af_channels(afl[0]) if c!=chan) if afl!=[] else '',now,now))
+    db.commit()
+    return True
+
+# known station confirmed by a short visit, too short for db_station_save(); ps only if received whole
+def db_station_seen(chan,pi,rssi,ps=''):
+    db_open().execute('UPDATE stations SET rssi=?,last_seen=?,stale=0'+(',ps=?' if ps!='' else '')+' WHERE chan=? AND pi=?',
+                      (rssi,time())+((ps,) if ps!='' else ())+(chan,pi))
+    db.commit()
+
+# known stations by channel, {chan:{pi:ps}}
+def db_known():
+    k={}
+    for chan,pi,ps in db_open().execute('SELECT chan,pi,ps FROM stations'): k.setdefault(chan,{})[pi]=ps
+    return k
+
+# stations not seen since t (start of a scan) marked stale; returns how many
+def db_mark_stale(t):
+    n=db_open().execute('UPDATE stations SET stale=1 WHERE last_seen<? AND stale=0',(t,)).rowcount
+    db.commit()
+    return n
+
+
+# PTY codes matching number or part of name, for the current RDS/RBDS table
+def db_pty_codes(s):
+    if s.isdigit(): return [int(s)]
+    return [x for x in range(len(RDS_RBDS_PTY_TYPES)) if s.lower() in RDS_RBDS_PTY_TYPES[x][RDS_RBDS].lower()]
+
+# query stations; filters as from the commandline: tmc, rtplus, eon, pty=<num|name>, pi=<hex>, freq=<MHz>, name=<part>
+def db_query(filters=[]):
+    where=[];args=[]
+    for f in filters:
+      k,_,v=f.partition('=')
+      if k in ('tmc','rtplus','eon','stale'): where.append(k+'=1')
+      elif k=='pty':
+        codes=db_pty_codes(v)
+        where.append('pty IN ('+','.join('?'*len(codes))+')');args+=codes
+      elif k=='pi': where.append('pi=?');args.append(int(v,16))
+      elif k=='freq': where.append('chan=?');args.append(round(float(v)*10))
+      elif k=='name': where.append('ps LIKE ?');args.append('%'+v+'%')
+      else: raise ValueError('unknown filter: '+f)
+    sql='SELECT chan,pi,ps,pty,rssi,tmc,rtplus,eon,stale,oda,af,first_seen,last_seen FROM stations'
+    if where!=[]: sql+=' WHERE '+' AND '.join(where)
+    return db_open().execute(sql+' ORDER BY chan,last_seen DESC',args).fetchall()
+
+# channels of known stations, for preset navigation; stale ones are skipped
+def db_presets():
+    return [r[0] for r in db_open().execute('SELECT DISTINCT chan FROM stations WHERE stale=0 ORDER BY chan')]
+
+# next/previous known station from chan, wraps around; 0 if none known
+def db_preset_step(chan,step=1):
+    pr=db_presets()
+    if pr==[]: return 0
+    if step>0:
+      for c in pr:
+        if c>chan: return c
+      return pr[0]
+    for c in reversed(pr):
+      if c<chan: return c
+    return pr[-1]
+
+
+def db_fmttime(t):
+    return strftime('%Y-%m-%d %H:%M',localtime(t))
+
+# stations command
+def main_stations(filters=[]):
+    try: rows=db_query(filters)
+    except ValueError as e: print('ERROR:',e);return
+    print('  freq   PI    name      rssi PTY                flags             ODA               first seen        last seen')
+    for chan,pi,ps,pty,rssi,tmc,rtplus,eon,stale,oda,af,first,last in rows:
+      flags=['',' TMC'][tmc]+['',' RT+'][rtplus]+['',' EON'][eon]+['',' stale'][stale]
+      ptyname=RDS_RBDS_PTY_TYPES[pty][RDS_RBDS] if pty>=0 else '?'
+      print(f'{fmtfreq(chan,pad=" ")}  {pi:04x}  "{ps}" {rssi:3}  {pty:2} {ptyname[:15]:<15} {flags:<17} {oda:<17} {db_fmttime(first)}  {db_fmttime(last)}')
+      if af!='': print('              AF: '+' '.join(fmtfreq(int(c),pad=' ').strip() for c in af.split()))
+    print(len(rows),'stations')
+    db_close()
@@ -0,0 +1,116 @@
+
+# small shared helpers: bit manipulation, sorting, console output formatting
+# kept free of tables and hardware imports, the light commandline paths use these too
+
+###########################
+##
+##  bit array manipulations
+##
+###########################
+
+# get value of val, bit b
+def getbit(val,b):
+  mask=(1<<b)
+  if mask & val: return 1
+  return 0
+
+# get value of n bits in at most 16bit val, starting on bit b
+def getbits(val,b,n):
+  mask=(0xFFFF>>(16-n))<<b
+  return (val & mask)>>b
+
+# get value of n bits in at most 48bit val, starting on bit b
+def getbits_long(val,b,n):
+  mask=(0xFFFFFFFFFFFF>>(48-n))<<b
+  return (val & mask)>>b
+
+# get all 37 bits in one number, for packed values
+def rds_to_raw(rds):
+    return ((rds[1]&0x1f)<<32)+(rds[2]<<16)+(rds[3])
+
+
+
+############################
+##
+##  natural sort
+##
+############################
+
+# from https://stackoverflow.com/questions/4836710/is-there-a-built-in-function-for-string-natural-sort
+def natsort(a):
+  from re import split as re_split # only needed for stats/lists, keep it off the startup path
+  natsort = lambda s: [' ' if t=='-' else int(t) if t.isdigit() else t.lower() for t in re_split('(\d+)', s.replace('-','0'))]
+  return sorted(a, key=natsort)
+
+
+
+############################
+##
+##  console output functions
+##
+############################
+
+# print value, immediately flush, no newline
+def p(s):
+    print(s,end='',flush=True)
+
+# get hex string from integer
+def hexstr(i,l=4):
+    return f'{i:04x}'[4-l:]
+
+
+def ints2str(i1,i2):
+    b=bytes([i1>>8, i1&0xff, i2>>8, i2&0xff])
+    #try: return b.decode('utf-8')
+    #except: return '????'
+    try: return '['+b.decode('utf-8')+']'
+    except: return str(b)
+
+def int2str(i1):
+    b=bytes([i1>>8, i1&0xff])
+    #try: return b.decode('utf-8')
+    #except: return '????'
+    try: return '['+b.decode('utf-8')+']'
+    except: return str(b)
+
+# get formatted packet payload, 37bit, XX:XXXX:XXXX
+def hexpayload(rds):
+    return hexstr(rds[1]&0x1F,l=2)+':'+hexstr(rds[2])+':'+hexstr(rds[3])
+
+
+# format frequency
+def fmtfreq(i,pad='0'):
+    s=(pad*4+str(i))[-4:]
+    return s[:3]+'.'+s[3:]
+
+# print line prefix with channel and RSSI
+def getchanrssi(chan,radio,spacer=''):
+    rssi=radio.si4703getRssi()
+    return fmtfreq(chan,pad=' ')+spacer+('    '+str(rssi))[-3:]+'  '
+
+def printchanrssi(chan,radio):
+    p(getchanrssi(chan,radio))
+
+
+
+############################
+##
+##  startup/phase timing
+##
+############################
+
+from time import perf_counter
+
+TIMING=[('start',perf_counter())]  # (phase name, perf_counter at phase end), shown by --timing
+
+# mark end of a phase
+def timing_mark(name):
+    TIMING.append((name,perf_counter()))
+
+# print phases with their durations, to stderr to keep dumps on stdout clean
+def timing_print(startcpu=None):
+    from sys import stderr
+    if startcpu is not None: print(f'timing: {"interpreter startup (cpu)":28} {1000*startcpu:7.1f} ms',file=stderr)
+    for x in range(1,len(TIMING)):
+      print(f'timing: {TIMING[x][0]:28} {1000*(TIMING[x][1]-TIMING[x-1][1]):7.1f} ms',file=stderr)
+    print(f'timing: {"total":28} {1000*(TIMING[-1][1]-TIMING[0][1]):7.1f} ms',file=stderr)